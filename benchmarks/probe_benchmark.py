@@ -0,0 +1,153 @@
+# benchmarks/probe_benchmark.py
+"""Compare the header-only probe backend against cv2.VideoCapture on a generated corpus.
+
+Usage (from the repository root):
+    python benchmarks/probe_benchmark.py --files 30 --payload-mb 64
+    python benchmarks/probe_benchmark.py --real      # encode real clips with cv2.VideoWriter instead
+
+Synthetic files carry valid MP4 (moov at the end, i.e. not fast-start), Matroska and AVI headers
+around a sparse payload, which is the worst case for a header walker and irrelevant to the size of
+the read. cv2 usually rejects synthetic files because they have no decodable frames, so use --real
+to time both backends on the same inputs.
+"""
+import argparse
+import statistics
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from probe import PROBE_BACKENDS, ProbeError  # noqa: E402
+
+RESOLUTIONS = [(640, 360), (1280, 720), (1920, 1080), (3840, 2160)]
+
+
+def _box(boxType: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), boxType) + payload
+
+
+def _ebml(elementId: int, payload: bytes) -> bytes:
+    idBytes: bytes = elementId.to_bytes((elementId.bit_length() + 7) // 8, "big")
+    return idBytes + (0x01 << 56 | len(payload)).to_bytes(8, "big") + payload
+
+
+def _riff(chunkId: bytes, payload: bytes) -> bytes:
+    return struct.pack("<4sI", chunkId, len(payload)) + payload + (b"\0" if len(payload) & 1 else b"")
+
+
+def writeMp4(path: Path, width: int, height: int, payload: int) -> None:
+    mvhd = _box(b"mvhd", bytes(12) + struct.pack(">II", 1000, 60_000) + bytes(80))
+    tkhd = _box(b"tkhd", bytes(76) + struct.pack(">II", width << 16, height << 16))
+    soun = _box(b"trak", _box(b"tkhd", bytes(84)))
+    moov = _box(b"moov", mvhd + soun + _box(b"trak", tkhd))
+    with open(path, "wb") as f:
+        f.write(_box(b"ftyp", b"isom\0\0\0\0isommp41"))
+        f.write(struct.pack(">I4s", 8 + payload, b"mdat"))
+        f.seek(payload, 1)
+        f.write(moov)
+
+
+def writeMkv(path: Path, width: int, height: int, payload: int) -> None:
+    info = _ebml(0x1549A966, _ebml(0x2AD7B1, (1_000_000).to_bytes(3, "big")) + _ebml(0x4489, struct.pack(">d", 60_000.0)))
+    video = _ebml(0xE0, _ebml(0xB0, width.to_bytes(2, "big")) + _ebml(0xBA, height.to_bytes(2, "big")))
+    tracks = _ebml(0x1654AE6B, _ebml(0xAE, _ebml(0x83, b"\x01") + video))
+    with open(path, "wb") as f:
+        f.write(_ebml(0x1A45DFA3, _ebml(0x4282, b"matroska")))
+        cluster = _ebml(0x1F43B675, b"")[:-8] + (0x01 << 56 | payload).to_bytes(8, "big")
+        f.write(_ebml(0x18538067, b"")[:-8] + (0x01 << 56 | len(info) + len(tracks) + len(cluster) + payload).to_bytes(8, "big"))
+        f.write(info + tracks + cluster)
+        f.seek(payload, 1)
+        f.truncate()
+
+
+def writeAvi(path: Path, width: int, height: int, payload: int) -> None:
+    avih = _riff(b"avih", struct.pack("<10I", 33_333, 0, 0, 0, 1800, 0, 1, 0, width, height) + bytes(16))
+    strh = _riff(b"strh", b"vidsMJPG" + struct.pack("<IHHIIIII", 0, 0, 0, 0, 1, 30, 0, 1800) + bytes(20))
+    strf = _riff(b"strf", struct.pack("<Iii", 40, width, height) + bytes(28))
+    hdrl = _riff(b"LIST", b"hdrl" + avih + _riff(b"LIST", b"strl" + strh + strf))
+    with open(path, "wb") as f:
+        f.write(b"RIFF" + struct.pack("<I", 4 + len(hdrl) + 12 + payload) + b"AVI ")
+        f.write(hdrl)
+        f.write(struct.pack("<4sI4s", b"LIST", 4 + payload, b"movi"))
+        f.seek(payload, 1)
+        f.truncate()
+
+
+WRITERS: Dict[str, Callable[[Path, int, int, int], None]] = {".mp4": writeMp4, ".mkv": writeMkv, ".avi": writeAvi}
+
+
+def syntheticCorpus(directory: Path, count: int, payloadBytes: int) -> List[Path]:
+    files: List[Path] = []
+    for i in range(count):
+        extension = list(WRITERS)[i % len(WRITERS)]
+        width, height = RESOLUTIONS[i % len(RESOLUTIONS)]
+        path = directory / f"synthetic_{i:04d}{extension}"
+        WRITERS[extension](path, width, height, payloadBytes)
+        files.append(path)
+    return files
+
+
+def realCorpus(directory: Path, count: int, frames: int) -> List[Path]:
+    import cv2
+    import numpy as np
+    codecs = {".mp4": "mp4v", ".avi": "MJPG", ".mkv": "XVID"}
+    files: List[Path] = []
+    for i in range(count):
+        extension = list(codecs)[i % len(codecs)]
+        width, height = RESOLUTIONS[i % 3]  # 4K clips take too long to encode for a benchmark
+        path = directory / f"real_{i:04d}{extension}"
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*codecs[extension]), 30, (width, height))
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        for n in range(frames):
+            frame[:] = n % 255
+            writer.write(frame)
+        writer.release()
+        files.append(path)
+    return files
+
+
+def timeBackend(name: str, files: List[Path], rounds: int) -> Dict[str, float]:
+    backend = PROBE_BACKENDS[name]
+    timings: List[float] = []
+    failures = 0
+    for _ in range(rounds):
+        for path in files:
+            start: float = time.perf_counter()
+            try:
+                backend(path)
+            except (ProbeError, OSError, ImportError):
+                failures += 1
+            timings.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": statistics.fmean(timings), "median_ms": statistics.median(timings),
+            "max_ms": max(timings), "failures": failures, "probes": len(timings)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=30, help="Number of files in the corpus.")
+    parser.add_argument("--payload-mb", type=int, default=64, help="Sparse payload per synthetic file.")
+    parser.add_argument("--rounds", type=int, default=3, help="Probe every file this many times.")
+    parser.add_argument("--real", action="store_true", help="Encode real clips with cv2.VideoWriter.")
+    parser.add_argument("--frames", type=int, default=60, help="Frames per clip with --real.")
+    parser.add_argument("--backends", nargs="+", default=list(PROBE_BACKENDS), help="Backends to compare.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="probe_bench_") as tmp:
+        directory = Path(tmp)
+        if args.real:
+            files = realCorpus(directory, args.files, args.frames)
+        else:
+            files = syntheticCorpus(directory, args.files, args.payload_mb * 1024 * 1024)
+        print(f"Corpus: {len(files)} {'real' if args.real else 'synthetic'} files in {directory}")
+        print(f"{'backend':<10} {'mean ms':>9} {'median ms':>10} {'max ms':>9} {'failed':>9}")
+        for name in args.backends:
+            stats = timeBackend(name, files, args.rounds)
+            print(f"{name:<10} {stats['mean_ms']:>9.3f} {stats['median_ms']:>10.3f} {stats['max_ms']:>9.3f} "
+                  f"{int(stats['failures']):>4}/{int(stats['probes'])}")
+
+
+if __name__ == "__main__":
+    main()
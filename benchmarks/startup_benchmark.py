@@ -0,0 +1,66 @@
+# benchmarks/startup_benchmark.py
+"""Measure the import cost of main.py with `python -X importtime` and fail when it exceeds a budget.
+
+Usage (from the repository root):
+    python benchmarks/startup_benchmark.py                  # default budget, 5 runs
+    python benchmarks/startup_benchmark.py --budget-ms 150 --top 15
+    python benchmarks/startup_benchmark.py --module runvlc  # any other importable module
+
+Each run is a fresh interpreter so nothing is cached in sys.modules; the median of the runs is compared
+against the budget. Exits with status 1 over budget, so it can guard against an eager import creeping back.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def importTimes(module: str) -> Tuple[float, Dict[str, float]]:
+    """Import module in a fresh interpreter; return (cumulative ms of module, self ms per imported module)."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                            capture_output=True, text=True, env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"})
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+    selfTimes: Dict[str, float] = {}
+    total: float = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        selfUs, cumulativeUs, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        selfTimes[name.strip()] = int(selfUs) / 1000
+        if name.strip() == module:
+            total = int(cumulativeUs) / 1000
+    return total, selfTimes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="Module to import.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to average over.")
+    parser.add_argument("--budget-ms", type=float, default=400.0, help="Maximum median cumulative import time.")
+    parser.add_argument("--top", type=int, default=10, help="Show the slowest modules (self time) of the last run.")
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    selfTimes: Dict[str, float] = {}
+    for _ in range(args.runs):
+        total, selfTimes = importTimes(args.module)
+        totals.append(total)
+    median: float = statistics.median(totals)
+    print(f"import {args.module}: median {median:.1f} ms, min {min(totals):.1f} ms, max {max(totals):.1f} ms "
+          f"over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"{'module':<40} {'self ms':>9}")
+    for name, ms in sorted(selfTimes.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{name:<40} {ms:>9.2f}")
+    if median > args.budget_ms:
+        print(f"OVER BUDGET by {median - args.budget_ms:.1f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
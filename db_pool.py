@@ -0,0 +1,115 @@
+# db_pool.py
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from setup_logger import l
+
+# Pragmas applied to every pooled connection. WAL lets the interactive thread read while a
+# background thread writes, NORMAL sync is safe under WAL and avoids an fsync per commit.
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,  # negative -> KiB, i.e. ~16 MB page cache per connection
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+
+class ConnectionPool:
+    """ Keeps one long-lived SQLite connection per thread.
+    Connections are opened lazily on first use, configured once with the pragmas above and then reused
+    for every query issued from that thread. sqlite3's per-connection statement cache (cached_statements)
+    gives prepared-statement reuse for the fixed queries in DatabaseManager.
+    Methods:  getConnection(): Return the calling thread's connection, opening it if needed.
+              closeAll(timeout): Close the connections no thread is using any more.
+              stats(): Return pool counters."""
+
+    def __init__(self, db_file: str, pragmas: Optional[Dict[str, Any]] = None, cachedStatements: int = 256, timeout: float = 30.0) -> None:
+        self.db_file: str = db_file
+        self.pragmas: Dict[str, Any] = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+        self.cachedStatements: int = cachedStatements
+        self.timeout: float = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._counters: Dict[str, int] = {"opened": 0, "closed": 0, "checkouts": 0, "reused": 0}
+        self._createdAt: float = time.monotonic()
+        self._closed: bool = False
+
+    def _openConnection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(database=self.db_file, timeout=self.timeout,
+                               cached_statements=self.cachedStatements, check_same_thread=False)
+        for pragma, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {pragma} = {value}")
+            except sqlite3.Error as e:
+                l.error(msg=f"Failed to apply PRAGMA {pragma}={value}: {e}")
+        return conn
+
+    def _pruneDeadThreads(self) -> None:
+        """Close connections owned by threads that have exited. Caller holds the lock."""
+        alive: set[int | None] = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+                self._counters["closed"] += 1
+            except sqlite3.Error as e:
+                l.error(msg=f"Error closing connection of finished thread {ident}: {e}")
+
+    def getConnection(self) -> sqlite3.Connection:
+        """Return the connection bound to the calling thread, opening and configuring it on first use."""
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        with self._lock:
+            self._counters["checkouts"] += 1
+            if conn is not None:
+                if self._closed:
+                    self._pruneDeadThreads()  # close what closeAll() had to leave open as its threads finish
+                self._counters["reused"] += 1
+                return conn
+            self._pruneDeadThreads()
+        conn = self._openConnection()
+        self._local.conn = conn
+        with self._lock:
+            self._connections[threading.get_ident()] = conn
+            self._counters["opened"] += 1
+        return conn
+
+    def closeAll(self, timeout: float = 0.0) -> None:
+        """ Close the calling thread's connection and those of threads that have finished.
+        Connections are shared with check_same_thread=False, so closing one under a thread that is still
+        running makes its next query fail with "Cannot operate on a closed database". closeAll() therefore
+        waits up to timeout seconds for the owning threads to exit and leaves the connections of threads that
+        are still running open; the pool is marked closed and closes those as their threads finish."""
+        current: int = threading.get_ident()
+        with self._lock:
+            self._closed = True
+            owners: Dict[int, threading.Thread] = {t.ident: t for t in threading.enumerate() if t.ident in self._connections}
+        deadline: float = time.monotonic() + timeout
+        for ident, thread in owners.items():
+            if ident != current and thread is not threading.main_thread():
+                thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        with self._lock:
+            own: sqlite3.Connection | None = self._connections.pop(current, None)
+            if own is not None:
+                try:
+                    own.close()
+                    self._counters["closed"] += 1
+                except sqlite3.Error as e:
+                    l.error(msg=f"Error closing pooled connection: {e}")
+                self._local.conn = None
+            self._pruneDeadThreads()
+            if self._connections:
+                l.warning(msg=f"Leaving {len(self._connections)} connections open for threads that are still running")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool counters."""
+        with self._lock:
+            checkouts: int = self._counters["checkouts"]
+            return {
+                **self._counters,
+                "open": len(self._connections),
+                "reuseRatio": round(self._counters["reused"] / checkouts, 4) if checkouts else 0.0,
+                "uptimeSeconds": round(time.monotonic() - self._createdAt, 1),
+            }
@@ -0,0 +1,186 @@
+# headless.py
+import fnmatch
+import itertools
+import json
+import os
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from scanner import ScanEntry
+from setup_logger import l, p, sB, sR, sW, sY
+
+DECISION_FIELDS: Tuple[str, ...] = ("_Type", "_Category", "_Tag", "_Rating")
+
+
+@dataclass
+class Rule:
+    """ One rules-file entry: every given condition must hold for the decision to apply.
+    Conditions: pattern (glob on the file name), regex (searched in the full path), parent (folder prefix),
+    quality (e.g. FHD), resolution (e.g. 1920x1080), min_size_mb / max_size_mb."""
+    decision: Dict[str, Any]
+    pattern: Optional[str] = None
+    regex: Optional[re.Pattern] = None
+    parent: Optional[str] = None
+    quality: Optional[str] = None
+    resolution: Optional[str] = None
+    min_size_mb: Optional[float] = None
+    max_size_mb: Optional[float] = None
+    name: str = ""
+
+    def matches(self, media_file) -> bool:
+        path: Path = media_file.sourceFilePath
+        sizeMb: float = media_file.FileSize / (1024 * 1024)
+        return ((self.pattern is None or fnmatch.fnmatch(path.name.lower(), self.pattern.lower()))
+                and (self.regex is None or self.regex.search(str(path)) is not None)
+                and (self.parent is None or os.path.normcase(str(path.parent)).startswith(os.path.normcase(self.parent)))
+                and (self.quality is None or media_file.Quality == self.quality)
+                and (self.resolution is None or media_file.FileRes == self.resolution)
+                and (self.min_size_mb is None or sizeMb >= self.min_size_mb)
+                and (self.max_size_mb is None or sizeMb <= self.max_size_mb))
+
+
+def loadRules(path: str | Path) -> List[Rule]:
+    """ Read rules from a YAML or JSON file: a list of {"match": {...conditions}, "set": {_Type, _Category, _Tag, _Rating}}.
+    Rules are tried in order and the first match wins.
+    Raises: ValueError: For a rule without a complete decision or with unknown conditions."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix.lower() in (".yaml", ".yml"):
+            import yaml  # only needed for YAML rules files
+            entries: List[Dict[str, Any]] = yaml.safe_load(f) or []
+        else:
+            entries = json.load(f)
+    rules: List[Rule] = []
+    for index, entry in enumerate(entries, start=1):
+        decision: Dict[str, Any] = dict(entry.get("set") or {})
+        if missing := [name for name in DECISION_FIELDS if not decision.get(name)]:
+            raise ValueError(f"Rule {index} in {path} does not set {', '.join(missing)}")
+        conditions: Dict[str, Any] = dict(entry.get("match") or {})
+        if "regex" in conditions:
+            conditions["regex"] = re.compile(conditions["regex"], re.IGNORECASE)
+        try:
+            rules.append(Rule(decision=decision, name=entry.get("name", f"rule {index}"), **conditions))
+        except TypeError as e:
+            raise ValueError(f"Rule {index} in {path}: {e}") from e
+    l.info(msg=f"Loaded {len(rules)} rules from {path}")
+    return rules
+
+
+@dataclass
+class HeadlessReport:
+    moved: int = 0
+    unmatched: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+
+class HeadlessSorter:
+    """ Applies known classifications without the wx/VLC review loop, e.g. on a server.
+    A file's decision comes from the first matching rule, or else from the DB mapping: the decision already
+    recorded for a media row with the same file name. The scan is consumed lazily in batches of batchSize: each
+    batch is registered, probed and decided before the next one is read, and at most batchSize moves are in
+    flight. Destinations are reserved through FileProcessor.reserveDestination before a move is queued, so
+    same-named files decided alike get unique names; moves and DB writes reuse FileProcessor.renameAndMoveFile
+    and DatabaseManager.updateRecord so the result is the same as deciding each file by hand. Files without a
+    decision are left in place and reported.
+    Methods:  run(entries): Sort the scanned files and return a HeadlessReport."""
+
+    def __init__(self, processor, makeMediaFile: Callable[[ScanEntry], Any], rules: Iterable[Rule] = (),
+                 dbMapping: Optional[Mapping[str, Dict[str, Any]]] = None, probeWorkers: int = 4,
+                 moveWorkers: int = 4, dryRun: bool = False, batchSize: int = 256) -> None:
+        self.processor = processor  # FileProcessor; its dbMan_ops, reserveDestination and renameAndMoveFile are used
+        self.makeMediaFile = makeMediaFile
+        self.rules: List[Rule] = list(rules)
+        self.dbMapping: Mapping[str, Dict[str, Any]] = dbMapping or {}
+        self.probeWorkers: int = max(1, probeWorkers)
+        self.moveWorkers: int = max(1, moveWorkers)
+        self.dryRun: bool = dryRun
+        self.batchSize: int = max(1, batchSize)
+
+    @staticmethod
+    def loadDbMapping(dbMan) -> Dict[str, Dict[str, Any]]:
+        """Map file names to the last decision recorded for them in the media table."""
+        columns: str = ", ".join(DECISION_FIELDS)
+        rows = dbMan.executeGETQuery(query=f"SELECT soureceFileName, {columns} FROM media "
+                                           f"WHERE _Type IS NOT NULL AND _Rating IS NOT NULL ORDER BY rowid")
+        return {row[0]: dict(zip(DECISION_FIELDS, row[1:])) for row in rows if row[0]}
+
+    def decide(self, media_file) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Return (source of the decision, decision) for a probed file, None if nothing applies."""
+        for rule in self.rules:
+            if rule.matches(media_file):
+                return rule.name, rule.decision
+        if (decision := self.dbMapping.get(media_file.soureceFileName)) is not None:
+            return "db mapping", decision
+        return None
+
+    def _commit(self, media_file) -> bool:
+        quality: str = media_file.getMediaQuality(FileRes=media_file.FileRes)
+        newDestPath, newFileName = self.processor.renameAndMoveFile(media_file=media_file, quality=quality)
+        if not (newDestPath and newFileName):
+            return False
+        return self.processor.dbMan_ops.updateRecord(media_file=media_file, new_file_location=newDestPath, new_file_name=newFileName)
+
+    @staticmethod
+    def _collect(moves: Dict[Any, str], report: HeadlessReport, limit: int = 0) -> None:
+        """Record finished moves until at most limit are still running."""
+        while len(moves) > limit:
+            done, _ = wait(moves, return_when=FIRST_COMPLETED)
+            for future in done:
+                path: str = moves.pop(future)
+                try:
+                    success: bool = future.result()
+                except Exception as e:
+                    l.error(msg=f"Error moving {path}: {e}")
+                    success = False
+                if success:
+                    report.moved += 1
+                else:
+                    report.failed.append(path)
+
+    def run(self, entries: Iterable[ScanEntry]) -> HeadlessReport:
+        report = HeadlessReport()
+        entries = iter(entries)
+        with ThreadPoolExecutor(max_workers=self.probeWorkers, thread_name_prefix="probe") as probePool, \
+                ThreadPoolExecutor(max_workers=self.moveWorkers, thread_name_prefix="move") as movePool:
+            moves: Dict[Any, str] = {}
+            while batch := list(itertools.islice(entries, self.batchSize)):
+                if not self.dryRun and self.processor.dbMan_ops.bulkIngestFiles(filepaths=[entry.path for entry in batch]) is None:
+                    l.error(msg=f"Could not register {len(batch)} scanned files, leaving them in place")
+                    report.failed.extend(str(entry.path) for entry in batch)
+                    continue
+                probes = {probePool.submit(self.makeMediaFile, entry): entry for entry in batch}
+                for future in as_completed(probes):
+                    path: str = str(probes[future].path)
+                    try:
+                        media_file = future.result()
+                        verdict = self.decide(media_file=media_file) if "x" in media_file.FileRes else None
+                    except Exception as e:
+                        l.error(msg=f"Error probing {path}: {e}")
+                        report.failed.append(path)
+                        continue
+                    if verdict is None:
+                        report.unmatched.append(path)
+                        continue
+                    source, decision = verdict
+                    for name in DECISION_FIELDS:
+                        setattr(media_file, name, decision[name])
+                    if not media_file.is_valid():
+                        report.unmatched.append(path)
+                        continue
+                    destination: Path = self.processor.reserveDestination(
+                        media_file=media_file, quality=media_file.getMediaQuality(FileRes=media_file.FileRes))
+                    if self.dryRun:
+                        p.print(f"[{sW}]{source}:[/][{sB}] {path}[/] -> [{sY}]{destination}[/]", end="\n")
+                        report.moved += 1
+                        continue
+                    moves[movePool.submit(self._commit, media_file)] = path
+                self._collect(moves=moves, report=report, limit=self.batchSize)
+            self._collect(moves=moves, report=report)
+        verb: str = "Would move" if self.dryRun else "Moved"
+        p.print(f"[{sW}]{verb}[/][{sY}] {report.moved}[/][{sW}] files, left[/][{sY}] {len(report.unmatched)}[/][{sW}] without a decision,[/]"
+                f"[{sR}] {len(report.failed)}[/][{sW}] failed[/]", end="\n")
+        for path in report.failed:
+            l.error(msg=f"Failed: {path}")
+        return report
@@ -0,0 +1,36 @@
+# lazy.py
+import importlib.util
+import sys
+from types import ModuleType
+from typing import Any
+
+
+class MissingModule(ModuleType):
+    """Stands in for a module that is not installed; raises the ImportError only when it is actually used."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__missing = name
+
+    def __getattr__(self, attribute: str) -> Any:
+        raise ModuleNotFoundError(f"No module named '{self.__missing}' (needed for {attribute})", name=self.__missing)
+
+
+def lazyImport(name: str) -> ModuleType:
+    """ Return a module whose code only runs on first attribute access (importlib.util.LazyLoader).
+    Heavy GUI and media backends (wx, vlc, cv2) cost seconds to import, and DB-only commands never touch them.
+    A module that is not installed becomes a MissingModule, so the error surfaces where it is used.
+    Args: name (str): Absolute module name, e.g. "wx" or "rich.table"."""
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        spec = importlib.util.find_spec(name)
+    except ModuleNotFoundError:  # a parent package is missing
+        spec = None
+    if spec is None or spec.loader is None:
+        return MissingModule(name)
+    spec.loader = importlib.util.LazyLoader(spec.loader)
+    module: ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
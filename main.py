@@ -1,41 +1,107 @@
 # main.py
 # import pysnooper
+import argparse
+import functools
+import os
+import queue
 import sys
 import threading
+import uuid
 from pathlib import Path
+import heapq
+import itertools
+import math
 import random
+import re
 import sqlite3
 import time
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
 from sqlite3 import OperationalError
-from typing import Any, Dict, List, Tuple, Literal, Optional
-import cv2
-import send2trash
-import wx  # _Type: ignore
-from runvlc import VLCMediaPlayerGUI
-from setup_logger import l, sY, p, sW, sR, sB
-from rich.table import Table
-import inquirer
+from typing import Any, Dict, Iterator, List, Tuple, Literal, Optional
+from lazy import lazyImport
+from setup_logger import interactivePrompt, l, sY, p, sW, sR, sB
+from db_pool import ConnectionPool
+from headless import HeadlessSorter, loadRules
+from preview import PreviewEngine
+from probe import DEFAULT_BACKENDS, ProbeResult, probeMedia
+from scanner import ScanEntry, scanMediaFiles
+from suggest import OPTION_TYPES, SuggestionEngine
+from utils.transfer import DestinationNameIndex, move_file
+from watcher import DirectoryWatcher
 import json
 import glob
 
-# Load configuration from JSON file
-with open(file='config/config.json', mode='r') as config_file:
-    CONFIG = json.load(fp=config_file)
+# GUI and prompt backends are loaded on first use so DB-only tooling can import this module cheaply
+wx = lazyImport("wx")
+runvlc = lazyImport("runvlc")
+inquirer = lazyImport("inquirer")
+send2trash = lazyImport("send2trash")
+richTable = lazyImport("rich.table")
 
-INDIR = Path(CONFIG["input_folder"])
-OUTDIR = Path(CONFIG["output_folder"])
-VALID_EXTENSIONS = CONFIG["valid_extensions"]
+CONFIG_PATH = "config/config.json"
 
-MEDIA_dbFile = CONFIG["media_db_file"]
-MEDIA_dbSchema = CONFIG["db_schema"]["media"]
-MEDIA_dbAlterStatements = CONFIG["alter_statements"]
+# Config-derived names kept for code that reads them as main.INDIR etc.; code in this module reads CONFIG instead
+CONFIG_CONSTANTS: dict[str, Any] = {
+    "INDIR": lambda config: Path(config["input_folder"]),
+    "OUTDIR": lambda config: Path(config["output_folder"]),
+    "VALID_EXTENSIONS": lambda config: config["valid_extensions"],
+    "MEDIA_dbFile": lambda config: config["media_db_file"],
+    "MEDIA_dbSchema": lambda config: config["db_schema"]["media"],
+    "MEDIA_dbAlterStatements": lambda config: config["alter_statements"],
+    "OPTIONS_dbFile": lambda config: config["options_db_file"],
+    "OPTIONS_dbSchema": lambda config: config["db_schema"]["options"],
+    "OPTIONS_dbAlter_Statements": lambda config: config["alter_option_statements"],
+}
 
-OPTIONS_dbFile = CONFIG["options_db_file"]
-OPTIONS_dbSchema = CONFIG["db_schema"]["options"]
-OPTIONS_dbAlter_Statements = CONFIG["alter_option_statements"]
 
+@functools.lru_cache(maxsize=None)
+def loadConfig(path: str = CONFIG_PATH) -> dict[str, Any]:
+    """ Load the JSON config once. Importing the module does not read the config, so a missing file only
+    fails when a value is first needed.
+    Returns: dict: The parsed config (cached; later calls return the same dict)."""
+    with open(file=path, mode='r') as config_file:
+        config: dict[str, Any] = json.load(fp=config_file)
+    return config
 
 
+class LazyConfig(Mapping):
+    """Read-only view of loadConfig() that loads the file on first access."""
+
+    def __getitem__(self, key: str) -> Any:
+        return loadConfig()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(loadConfig())
+
+    def __len__(self) -> int:
+        return len(loadConfig())
+
+
+CONFIG: Mapping = LazyConfig()
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the config-derived names for code that reads them as main.INDIR etc."""
+    if name in CONFIG_CONSTANTS:
+        return CONFIG_CONSTANTS[name](loadConfig())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Indexes managed by IndexManager. Override with CONFIG["db_indexes"] and bump CONFIG["db_index_version"]
+# to have indexes that are no longer listed dropped on the next start.
+DEFAULT_DB_INDEXES: list[dict[str, Any]] = [
+    {"name": "ux_media_sourceFilePath", "table": "media", "columns": ["sourceFilePath"], "unique": True},
+    {"name": "ix_media_Type_Category_Tag", "table": "media", "columns": ["_Type", "_Category", "_Tag"]},
+]
+DB_INDEX_VERSION = 2  # 2: dropped the ix_options_* indexes, the UNIQUE columns of options are indexed already
+
+
+
+
+class SkipFile(Exception):
+    """Raised from the prompts when the user skips the current file."""
+
 
 class ErrorLogger:
     def __init__(self) -> None:
@@ -77,17 +143,26 @@ class mediaPlayer:
 
     def __init__(self) -> None:
         self.app: Any = wx.App(False)
-        self.player_gui = VLCMediaPlayerGUI(parent=None)
+        self.player_gui = runvlc.VLCMediaPlayerGUI(parent=None)
 
     def play(self, media_file) -> None:
-        if hasattr(media_file, 'sourceFilePath'):
+        if getattr(media_file, 'previewPath', None):
+            self.player_gui.show_preview(image_path=media_file.previewPath, filepath=str(object=media_file.sourceFilePath))
+        elif hasattr(media_file, 'sourceFilePath'):
             self.player_gui.load_media(filepath=str(object=media_file.sourceFilePath))
             self.player_gui.on_play(event=None)
         else:
             l.error(msg="Media file does not have a 'sourceFilePath' attribute")
 
-    def stop(self) -> None:
+    def preload(self, media_file) -> None:
+        """Prepare the next file so the following play() starts without the demux/buffer delay."""
+        self.player_gui.preload_media(filepath=str(object=media_file))
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop playback and wait (bounded) for VLC to report MediaPlayerStopped."""
         self.player_gui.on_stop(event=None)
+        if not self.player_gui.wait_until_stopped(timeout=timeout):
+            l.warning(msg=f"VLC did not report stopped within {timeout}s")
 
     def remove(self) -> None:
         try:
@@ -99,10 +174,16 @@ class mediaPlayer:
 class MediaDetails:
     """Represents a media file with attributes such as FileRes, FileSize, _Category, _Tag, etc."""
 
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, probe: bool = True, probeCache: Optional["ProbeCache"] = None,
+                 stat: Optional[os.stat_result] = None) -> None:
         """Initialize a new fMedia object.
-        Args: filepath (Path): The filepath of the media file."""
+        Args: filepath (Path): The filepath of the media file.
+              probe (bool): Read size and resolution now. Pass False to defer it to probe().
+              probeCache (ProbeCache, optional): Persistent cache consulted before probing.
+              stat (os.stat_result, optional): Stat result carried over from the directory scan."""
         self.error_logger = ErrorLogger()
+        self.probeCache: Optional[ProbeCache] = probeCache
+        self.stat: Optional[os.stat_result] = stat
         try:
             self.fileId: int = random.randint(1, 999999)
             self.Count = 0
@@ -117,12 +198,57 @@ class MediaDetails:
             self._Processed = False
             self.sourceFilePath: Any = filepath
             self.soureceFileName = filepath.name
-            self.FileSize: int = self.getMediaSize()
-            self.FileRes: str = self.getMediaFileDetails()
+            self.FileSize: int = 0
+            self.FileRes: str = ""
+            self.Quality: str = ""
+            self.Duration: Optional[float] = None
+            self.previewPath: Optional[Path] = None
+            self.probed = False
+            if probe:
+                self.probe()
         except Exception as e:
             l.error(f"Error during initialization of MediaDetails: {e}")
             self.error_logger.handle_error(error=e)
 
+    def probe(self) -> "MediaDetails":
+        """ Fill in FileSize, FileRes and Quality. Safe to call from a worker thread. """
+        self.FileSize = self.getMediaSize()
+        cached = self.probeCache.lookup(filepath=self.sourceFilePath, stat=self.stat) if self.probeCache and self.stat else None
+        if cached is not None:
+            self.FileRes, self.Quality, self.Duration = cached
+        else:
+            self.FileRes = self.getMediaFileDetails()
+            if "x" in self.FileRes:
+                self.Quality = self.getMediaQuality(FileRes=self.FileRes)
+                if self.probeCache and self.stat:
+                    self.probeCache.store(filepath=self.sourceFilePath, stat=self.stat, FileRes=self.FileRes,
+                                          Quality=self.Quality, Duration=self.Duration)
+        self.probed = True
+        return self
+
+    RECORD_FIELDS: tuple[str, ...] = ("fileId", "soureceFileName", "FileSize", "FileRes", "Quality", "Duration",
+                                      "_Type", "_Category", "_Tag", "_Rating", "destFileName")
+
+    def toRecord(self) -> dict[str, Any]:
+        """ Serialise the decided attributes, e.g. for the commit journal. """
+        return {"sourceFilePath": str(object=self.sourceFilePath), **{field: getattr(self, field) for field in self.RECORD_FIELDS}}
+
+    @classmethod
+    def fromRecord(cls, record: dict[str, Any]) -> "MediaDetails":
+        """ Rebuild a MediaDetails from toRecord() output without probing the file again. """
+        media_file = cls(filepath=Path(record["sourceFilePath"]), probe=False)
+        for field in cls.RECORD_FIELDS:
+            if field in record:
+                setattr(media_file, field, record[field])
+        media_file.probed = True
+        return media_file
+
+    def printDetails(self) -> None:
+        """ Print the file banner when the file reaches the prompt. """
+        p.print("*" * 50, style="green", end="\n")
+        p.print(f" [{sW}]getMediaFileDetails:[/][{sB}] {self.sourceFilePath}[/] | [{sW}]Quality:[/][{sR}] {self.Quality} [/]", end="\n")
+        p.print("*" * 50, style="green", end="\n")
+
     def getMediaQuality(self, FileRes) -> str:
         """ Determine the quality of the media based on FileRes. """
         width, height = map(int, FileRes.split("x"))
@@ -141,7 +267,9 @@ class MediaDetails:
         # sourcery skip: inline-immediately-returned-variable
         """ Get the size of the media file. """
         try:
-            size: int = self.sourceFilePath.stat().st_size
+            if self.stat is None:
+                self.stat = self.sourceFilePath.stat()
+            size: int = self.stat.st_size
             return size
         except Exception as e:
             l.error(msg="Error in getMediaSize")
@@ -149,21 +277,11 @@ class MediaDetails:
             return 0
 
     def getMediaFileDetails(self) -> str:  # sourcery skip: extract-method
-        """ Get the FileRes of the media file. """
+        """ Get the FileRes of the media file from its container header, falling back to cv2. """
         try:
-            cap = cv2.VideoCapture(filename=str(object=self.sourceFilePath))
-            if not cap.isOpened():
-                raise ValueError(f"Failed to open {self.soureceFileName} for FileRes")
-
-            width = int(cap.get(propId=cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(propId=cv2.CAP_PROP_FRAME_HEIGHT))
-            FileRes: str = f"{width}x{height}"
-            quality: str = self.getMediaQuality(FileRes=FileRes)
-
-            p.print("*" * 50, style="green", end="\n")
-            p.print(f" [{sW}]getMediaFileDetails:[/][{sB}] {self.sourceFilePath}[/] | [{sW}]Quality:[/][{sR}] {quality} [/]", end="\n")
-            p.print("*" * 50, style="green", end="\n")
-            return FileRes
+            result: ProbeResult = probeMedia(path=self.sourceFilePath, backends=CONFIG.get("probe_backends", DEFAULT_BACKENDS))
+            self.Duration = result.duration
+            return result.resolution
         except Exception as e:
             l.error(msg="Error in getMediaFileDetails")
             self.error_logger.handle_error(error=e)
@@ -175,21 +293,548 @@ class MediaDetails:
         return all(getattr(self, attr, None) not in [None, '', 0] for attr in required_attributes)
 
 
+class ProbeCache:
+    """ Persistent probe results in the media DB, keyed by (sourceFilePath, FileSize, mtimeNs).
+    An entry is only served while the file's size and mtime still match; a changed key re-probes and
+    overwrites it. evictStale() drops entries unused for maxAgeDays and trims to maxEntries (LRU)."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS probe_cache (
+            sourceFilePath TEXT PRIMARY KEY,
+            FileSize INTEGER NOT NULL,
+            mtimeNs INTEGER NOT NULL,
+            FileRes TEXT,
+            Quality TEXT,
+            Duration REAL,
+            lastUsed REAL NOT NULL
+        )
+    """
+    TOUCH_INTERVAL = 86400  # only rewrite lastUsed once a day per entry
+
+    def __init__(self, dbMan, maxAgeDays: float = 90, maxEntries: int = 250000) -> None:
+        self.dbMan_ops: Any = dbMan
+        self.maxAgeDays: float = maxAgeDays
+        self.maxEntries: int = maxEntries
+        self.error_logger = ErrorLogger()
+
+    def initialize(self) -> None:
+        self.dbMan_ops.executePOSTQuery(query=self.SCHEMA)
+        self.dbMan_ops.executePOSTQuery(query="CREATE INDEX IF NOT EXISTS idx_probe_cache_lastUsed ON probe_cache (lastUsed)")
+
+    def lookup(self, filepath, stat: os.stat_result) -> Optional[Tuple[str, str, Optional[float]]]:
+        """ Return (FileRes, Quality, Duration) if the cached key still matches the file, None otherwise. """
+        query = "SELECT FileRes, Quality, Duration, lastUsed FROM probe_cache WHERE sourceFilePath = ? AND FileSize = ? AND mtimeNs = ?"
+        rows = self.dbMan_ops.executeGETQuery(query=query, params=(str(filepath), stat.st_size, stat.st_mtime_ns))
+        if not rows:
+            return None
+        FileRes, Quality, Duration, lastUsed = rows[0]
+        now: float = time.time()
+        if now - lastUsed > self.TOUCH_INTERVAL:
+            self.dbMan_ops.executePOSTQuery(query="UPDATE probe_cache SET lastUsed = ? WHERE sourceFilePath = ?", params=(now, str(filepath)))
+        return FileRes, Quality, Duration
+
+    def store(self, filepath, stat: os.stat_result, FileRes: str, Quality: str, Duration: Optional[float]) -> None:
+        query = """
+            INSERT INTO probe_cache (sourceFilePath, FileSize, mtimeNs, FileRes, Quality, Duration, lastUsed)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (sourceFilePath) DO UPDATE SET
+                FileSize = excluded.FileSize, mtimeNs = excluded.mtimeNs, FileRes = excluded.FileRes,
+                Quality = excluded.Quality, Duration = excluded.Duration, lastUsed = excluded.lastUsed
+        """
+        params = (str(filepath), stat.st_size, stat.st_mtime_ns, FileRes, Quality, Duration, time.time())
+        self.dbMan_ops.executePOSTQuery(query=query, params=params)
+
+    def evictStale(self) -> None:
+        """ Drop entries not used for maxAgeDays, then the least recently used ones beyond maxEntries. """
+        try:
+            cutoff: float = time.time() - self.maxAgeDays * 86400
+            self.dbMan_ops.executePOSTQuery(query="DELETE FROM probe_cache WHERE lastUsed < ?", params=(cutoff,))
+            self.dbMan_ops.executePOSTQuery(
+                query="""DELETE FROM probe_cache WHERE sourceFilePath IN (
+                             SELECT sourceFilePath FROM probe_cache ORDER BY lastUsed DESC LIMIT -1 OFFSET ?)""",
+                params=(self.maxEntries,))
+        except Exception as e:
+            l.error(msg="Error evicting stale probe cache entries")
+            self.error_logger.handle_error(error=e)
+
+
+class MediaPrefetcher:
+    """ Probes media files in a worker pool ahead of the interactive cursor.
+    Iterating yields MediaDetails in source order; up to `lookahead` files beyond the current one are
+    already being probed (and, with a PreviewEngine, having their contact sheet built) so the prompt does
+    not wait on cv2.
+    Methods:  __next__(): Return the next probed MediaDetails.
+              close(): Cancel outstanding probes and stop the workers."""
+
+    def __init__(self, workQueue: "WorkQueue", lookahead: int = 4, workers: int = 2, probeCache: Optional[ProbeCache] = None,
+                 previewEngine: Optional[PreviewEngine] = None) -> None:
+        self.workQueue: WorkQueue = workQueue
+        self.probeCache: Optional[ProbeCache] = probeCache
+        self.previewEngine: Optional[PreviewEngine] = previewEngine
+        self.lookahead: int = max(1, lookahead)
+        self._pending: deque[tuple[Any, Future, Optional[Future]]] = deque()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="probe")
+
+    def _fill(self, block: bool = True) -> None:
+        while len(self._pending) < self.lookahead:
+            # Only block for new work when nothing is in flight, otherwise hand out what is ready
+            file = self.workQueue.get(block=block and not self._pending)
+            if file is None:
+                return
+            probe: Future = self._executor.submit(MediaDetails, filepath=file, probeCache=self.probeCache,
+                                                  stat=self.workQueue.takeStat(file=file))
+            preview: Optional[Future] = self.previewEngine.submit(path=file) if self.previewEngine else None
+            self._pending.append((file, probe, preview))
+
+    def __iter__(self) -> "MediaPrefetcher":
+        return self
+
+    def __next__(self) -> MediaDetails:
+        self._fill()
+        if not self._pending:
+            self.close()
+            raise StopIteration
+        _, probe, preview = self._pending.popleft()
+        # Top up without blocking: in watch mode the queue stays open, and waiting here would hold back this file
+        self._fill(block=False)
+        media_file: MediaDetails = probe.result()
+        if preview is not None:
+            media_file.previewPath = preview.result()  # None on failure, which falls back to playback
+        return media_file
+
+    def peek(self) -> Any:
+        """Return the path of the file that will be handed out next, if one is already queued."""
+        return self._pending[0][0] if self._pending else None
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class WorkQueue:
+    """ The queue of files feeding processFiles.
+    Orders: "shuffle" and "fifo" use a deque (O(1) get and requeue, shuffle is applied per extend() batch);
+    "largest" and "newest" use a heap (O(log n)). A requeued file goes behind every file not requeued yet.
+    With a dbMan the queue is mirrored in the work_queue table: restore() reloads it in the same order on the
+    next start and markDone() removes a file once it has been handled.
+    Methods:  extend(files): Add files not already queued.
+              get(block): Next file, or None when empty (non-blocking) or closed and drained.
+              requeue(file): Put a file back at the end.
+              markDone(file): Forget a handled file.
+              close(): No more files will be added; blocked get() calls return once drained."""
+
+    ORDERS: tuple[str, ...] = ("shuffle", "fifo", "largest", "newest")
+    SCHEMA = "CREATE TABLE IF NOT EXISTS work_queue (sourceFilePath TEXT PRIMARY KEY, position INTEGER NOT NULL)"
+
+    def __init__(self, order: str = "shuffle", dbMan=None) -> None:
+        if order not in self.ORDERS:
+            l.error(msg=f"Unknown queue order {order}, using shuffle")
+            order = "shuffle"
+        self.order: str = order
+        self.dbMan_ops: Any = dbMan
+        self._deque: deque[Any] = deque()
+        self._heap: list[tuple[int, float, int, Any]] = []
+        self._members: set[str] = set()
+        self._stats: dict[str, os.stat_result] = {}
+        self._sequence: int = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self.error_logger = ErrorLogger()
+        if self.dbMan_ops is not None:
+            self.dbMan_ops.executePOSTQuery(query=self.SCHEMA)
+            rows = self.dbMan_ops.executeGETQuery(query="SELECT COALESCE(MAX(position), 0) FROM work_queue")
+            self._sequence = int(rows[0][0]) if rows else 0
+
+    def _priority(self, file) -> float:
+        try:
+            stat: os.stat_result = self._stats.get(str(object=file)) or file.stat()
+            if self.order == "largest":
+                return -stat.st_size
+            if self.order == "newest":
+                return -stat.st_mtime
+        except OSError:
+            pass
+        return 0.0
+
+    def _push(self, file, tier: int = 0) -> None:
+        """Add to the in-memory structure. Caller holds the condition lock."""
+        self._sequence += 1
+        if self.order in ("largest", "newest"):
+            heapq.heappush(self._heap, (tier, self._priority(file=file), self._sequence, file))
+        else:
+            self._deque.append(file)
+        self._members.add(str(object=file))
+
+    def _persist(self, entries: list[tuple[str, int]]) -> None:
+        if self.dbMan_ops is None or not entries:
+            return
+        conn: sqlite3.Connection | None = self.dbMan_ops.db_conn.getDBConnection()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.executemany("""INSERT INTO work_queue (sourceFilePath, position) VALUES (?, ?)
+                                    ON CONFLICT (sourceFilePath) DO UPDATE SET position = excluded.position""", entries)
+        except Exception as e:
+            l.error(msg="Error persisting work queue")
+            self.error_logger.handle_error(error=e)
+
+    def restore(self) -> int:
+        """ Reload the persisted queue of the previous session, dropping files that are gone.
+        Returns: int: The number of files restored."""
+        if self.dbMan_ops is None:
+            return 0
+        rows = self.dbMan_ops.executeGETQuery(query="SELECT sourceFilePath FROM work_queue ORDER BY position")
+        gone: list[tuple[str]] = []
+        with self._cond:
+            for (sourceFilePath,) in rows:
+                file = Path(sourceFilePath)
+                if file.exists():
+                    self._push(file=file)
+                else:
+                    gone.append((sourceFilePath,))
+            self._cond.notify_all()
+        if gone:
+            conn: sqlite3.Connection | None = self.dbMan_ops.db_conn.getDBConnection()
+            if conn is not None:
+                with conn:
+                    conn.executemany("DELETE FROM work_queue WHERE sourceFilePath = ?", gone)
+        return len(rows) - len(gone)
+
+    def extend(self, files, stats: Optional[dict[str, os.stat_result]] = None) -> int:
+        """ Add files that are not queued yet.
+        Args: files: Paths to add.
+              stats (dict, optional): Stat results from the scan keyed by str(path), handed on to MediaDetails.
+        Returns: int: The number of files added."""
+        batch: list[Any] = list(files)
+        if self.order == "shuffle":
+            random.shuffle(x=batch)
+        entries: list[tuple[str, int]] = []
+        with self._cond:
+            if stats:
+                self._stats.update(stats)
+            for file in batch:
+                if str(object=file) in self._members:
+                    continue
+                self._push(file=file)
+                entries.append((str(object=file), self._sequence))
+            self._cond.notify_all()
+        self._persist(entries=entries)
+        return len(entries)
+
+    def put(self, file, stat: Optional[os.stat_result] = None) -> int:
+        return self.extend(files=[file], stats={str(object=file): stat} if stat else None)
+
+    def takeStat(self, file) -> Optional[os.stat_result]:
+        """Return (and forget) the scan-time stat result of a file, if there is one."""
+        with self._cond:
+            return self._stats.pop(str(object=file), None)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        with self._cond:
+            if block:
+                self._cond.wait_for(lambda: self._deque or self._heap or self._closed, timeout=timeout)
+            if self._heap:
+                file = heapq.heappop(self._heap)[3]
+            elif self._deque:
+                file = self._deque.popleft()
+            else:
+                return None
+            return file  # stays a member until markDone so a rescan cannot queue it twice
+
+    def requeue(self, file) -> None:
+        """Put a file back behind everything that has not been requeued."""
+        with self._cond:
+            self._push(file=file, tier=1)
+            self._cond.notify_all()
+            position: int = self._sequence
+        self._persist(entries=[(str(object=file), position)])
+
+    def markDone(self, file) -> None:
+        with self._cond:
+            self._members.discard(str(object=file))
+        if self.dbMan_ops is not None:
+            self.dbMan_ops.executePOSTQuery(query="DELETE FROM work_queue WHERE sourceFilePath = ?", params=(str(object=file),))
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._deque) + len(self._heap)
+
+
+class CommitWorker:
+    """ Moves decided files and writes their DB rows on a background thread.
+    Every submitted job is appended (and fsynced) to a JSON-lines journal before it is queued and marked done
+    afterwards, so jobs that were pending when the process died are replayed on the next start. Failed jobs are
+    retried with a growing delay; a batch job is re-journaled with only its uncommitted files after each attempt.
+    A file that isGone reports as permanently uncommittable (source deleted, nothing at the destination) is not
+    retried: it is journaled as failed so it is neither retried now nor replayed later.
+    Methods:  start(): Replay the journal and start the worker thread.
+              submit(media_file, quality): Queue a decided file.
+              submitBatch(media_files): Queue a batch that shares one decision as a single job.
+              drain(): Wait for queued jobs to finish and stop the thread."""
+
+    def __init__(self, commit, journalPath: str | Path, maxRetries: int = 3, retryDelay: float = 2.0, commitBatch=None,
+                 isGone=None) -> None:
+        self.commit = commit  # callable(media_file, quality) -> bool
+        self.commitBatch = commitBatch  # callable(media_files) -> set of committed source paths, for jobs from submitBatch
+        self.isGone = isGone  # callable(media_file) -> bool, True when a failed commit can never succeed
+        self.journalPath = Path(journalPath)
+        self.maxRetries: int = maxRetries
+        self.retryDelay: float = retryDelay
+        self.jobs: "queue.Queue[Optional[tuple[str, Any, Optional[str]]]]" = queue.Queue()  # quality None marks a batch
+        self._journalLock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="commit-worker")
+        self.error_logger = ErrorLogger()
+
+    def _journal(self, jobId: str, state: str, record: Optional[dict[str, Any]] = None,
+                 batch: Optional[list[dict[str, Any]]] = None) -> None:
+        entry: dict[str, Any] = {"id": jobId, "state": state, "time": time.time()}
+        if record is not None:
+            entry["record"] = record
+        if batch is not None:
+            entry["batch"] = batch
+        with self._journalLock, open(self.journalPath, mode="a", encoding="utf-8") as journal:
+            journal.write(json.dumps(entry) + "\n")
+            journal.flush()
+            os.fsync(journal.fileno())
+
+    def _pendingJobs(self) -> dict[str, dict[str, Any]]:
+        """Return journal entries whose last state is still pending (not done or failed), in submission order."""
+        pending: dict[str, dict[str, Any]] = {}
+        if not self.journalPath.exists():
+            return pending
+        with open(self.journalPath, mode="r", encoding="utf-8") as journal:
+            for line in journal:
+                try:
+                    entry: dict[str, Any] = json.loads(line)
+                except json.JSONDecodeError:
+                    l.error(msg=f"Skipping torn commit journal line: {line.strip()[:80]}")
+                    continue
+                if entry["state"] == "pending":
+                    pending[entry["id"]] = entry
+                else:
+                    pending.pop(entry["id"], None)
+        return pending
+
+    def _compact(self, pending: dict[str, dict[str, Any]]) -> None:
+        """Rewrite the journal with only the still-pending entries."""
+        with self._journalLock:
+            tmpPath: Path = self.journalPath.with_suffix(".tmp")
+            with open(tmpPath, mode="w", encoding="utf-8") as journal:
+                for entry in pending.values():
+                    journal.write(json.dumps(entry) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+            os.replace(tmpPath, self.journalPath)
+
+    def start(self) -> None:
+        self.journalPath.parent.mkdir(parents=True, exist_ok=True)
+        pending = self._pendingJobs()
+        self._compact(pending)
+        for jobId, entry in pending.items():
+            if "batch" in entry:
+                l.info(msg=f"Replaying unfinished batch commit of {len(entry['batch'])} files")
+                self.jobs.put((jobId, [MediaDetails.fromRecord(record=record) for record in entry["batch"]], None))
+                continue
+            l.info(msg=f"Replaying unfinished commit for {entry['record']['sourceFilePath']}")
+            self.jobs.put((jobId, MediaDetails.fromRecord(record=entry["record"]), entry["record"]["Quality"]))
+        self._thread.start()
+
+    def submit(self, media_file: MediaDetails, quality: str) -> None:
+        jobId: str = uuid.uuid4().hex
+        record: dict[str, Any] = {**media_file.toRecord(), "Quality": quality}
+        self._journal(jobId=jobId, state="pending", record=record)
+        self.jobs.put((jobId, media_file, quality))
+
+    def submitBatch(self, media_files: list[MediaDetails]) -> None:
+        if self.commitBatch is None:
+            raise ValueError("CommitWorker was created without commitBatch")
+        jobId: str = uuid.uuid4().hex
+        self._journal(jobId=jobId, state="pending", batch=[media_file.toRecord() for media_file in media_files])
+        self.jobs.put((jobId, media_files, None))
+
+    def _gone(self, media_file: MediaDetails) -> bool:
+        try:
+            gone: bool = self.isGone is not None and self.isGone(media_file)
+        except Exception as e:
+            self.error_logger.handle_error(error=e)
+            return False
+        if gone:
+            l.error(msg=f"Dropping commit for {media_file.sourceFilePath}: the source no longer exists")
+        return gone
+
+    def _attemptBatch(self, jobId: str, media_files: list[MediaDetails]) -> list[MediaDetails]:
+        """ Commit a batch once and return the files that still need committing.
+        Files that were committed or are gone are taken out of the journaled job right away, so neither a retry nor
+        a replay moves or records them (Count, suggestion observations) a second time."""
+        try:
+            committed: set[str] = self.commitBatch(media_files)
+        except Exception as e:
+            self.error_logger.handle_error(error=e)
+            committed = set()
+        failed: list[MediaDetails] = [media_file for media_file in media_files if str(media_file.sourceFilePath) not in committed]
+        remaining: list[MediaDetails] = [media_file for media_file in failed if not self._gone(media_file)]
+        if not remaining:
+            self._journal(jobId=jobId, state="failed" if failed else "done")
+        elif len(remaining) < len(media_files):
+            self._journal(jobId=jobId, state="pending", batch=[media_file.toRecord() for media_file in remaining])
+        return remaining
+
+    def _run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            try:
+                if job is None:
+                    return
+                jobId, payload, quality = job
+                for attempt in range(1, self.maxRetries + 1):
+                    if quality is None:
+                        payload = self._attemptBatch(jobId=jobId, media_files=payload)
+                        if not payload:
+                            break
+                    else:
+                        try:
+                            if self.commit(payload, quality):
+                                self._journal(jobId=jobId, state="done")
+                                break
+                        except Exception as e:
+                            self.error_logger.handle_error(error=e)
+                        if self._gone(payload):
+                            self._journal(jobId=jobId, state="failed")
+                            break
+                    label: str = f"batch of {len(payload)} files" if quality is None else str(payload.sourceFilePath)
+                    l.error(msg=f"Commit attempt {attempt}/{self.maxRetries} failed for {label}")
+                    if attempt < self.maxRetries:
+                        time.sleep(self.retryDelay * attempt)
+                else:
+                    # Left pending in the journal so the next start retries it
+                    l.error(msg=f"Giving up on {label} for this session; it stays in the commit journal")
+            finally:
+                self.jobs.task_done()
+
+    def drain(self) -> None:
+        """Block until every queued job has been processed, then stop the worker thread."""
+        if not self._thread.is_alive():
+            return
+        l.info(msg=f"Draining {self.jobs.qsize()} pending commits")
+        self.jobs.join()
+        self.jobs.put(None)
+        self._thread.join()
+        self._compact(self._pendingJobs())
+
+
+class OptionCatalogue:
+    """ In-memory copy of the options table so prompts do not query the DB three times per file.
+    Loaded with a single query and updated in place by add()/remove(). Triggers on options bump a counter in
+    options_version, and the catalogue reloads only when that counter moved, so commits to other tables (probe
+    cache, work queue, CommitWorker updates) do not invalidate it. The counter is only read after PRAGMA
+    data_version, which is per connection and free to query, reports a commit from another connection."""
+
+    OPTION_TYPES: Tuple[str, ...] = ('_Type', '_Category', '_Tag')
+    SCHEMA: Tuple[str, ...] = (
+        "CREATE TABLE IF NOT EXISTS options_version (id INTEGER PRIMARY KEY CHECK (id = 0), version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO options_version (id, version) VALUES (0, 0)",
+        *(f"CREATE TRIGGER IF NOT EXISTS options_version_{event.lower()} AFTER {event} ON options "
+          f"BEGIN UPDATE options_version SET version = version + 1 WHERE id = 0; END" for event in ("INSERT", "UPDATE", "DELETE")),
+    )
+    LOAD_QUERY: str = f"SELECT {', '.join(OPTION_TYPES)} FROM options"
+    VERSION_QUERY: str = "SELECT version FROM options_version WHERE id = 0"
+
+    def __init__(self, dbMan) -> None:
+        self.dbMan_ops: Any = dbMan
+        self.error_logger = ErrorLogger()
+        self._options: Dict[str, Dict[str, None]] = {}  # option_type -> ordered set of values
+        self._dataVersion: Optional[Tuple[int, int]] = None  # (id(connection), data_version) of the last check
+        self._version: Optional[int] = None  # options_version.version the catalogue was loaded at
+        self._lock = threading.Lock()
+
+    def initialize(self) -> None:
+        for query in self.SCHEMA:
+            self.dbMan_ops.executePOSTQuery(query=query)
+
+    def _readVersions(self) -> Tuple[Optional[Tuple[int, int]], Optional[int]]:
+        """Return (data_version of this thread's connection, options counter), the counter None if it cannot be read."""
+        try:
+            conn: sqlite3.Connection | None = self.dbMan_ops.db_conn.getDBConnection()
+            if conn is None:
+                return None, None
+            dataVersion: Tuple[int, int] = (id(conn), conn.execute("PRAGMA data_version").fetchone()[0])
+            if dataVersion == self._dataVersion and self._version is not None:
+                return dataVersion, self._version
+            row = conn.execute(self.VERSION_QUERY).fetchone()
+            return dataVersion, row[0] if row else None
+        except Exception as e:
+            self.error_logger.handle_error(error=e)
+            return None, None
+
+    def _load(self, version: Optional[int]) -> None:
+        rows: List[Tuple] = self.dbMan_ops.executeGETQuery(query=self.LOAD_QUERY)
+        self._options = {option_type: {} for option_type in self.OPTION_TYPES}
+        for row in rows:
+            for option_type, value in zip(self.OPTION_TYPES, row):
+                if value:  # Exclude None or empty values
+                    self._options[option_type][value] = None
+        self._version = version
+
+    def get(self, option_type: str) -> list[str]:
+        """Return a copy of the values for option_type, reloading first if the DB changed underneath."""
+        with self._lock:
+            self._dataVersion, version = self._readVersions()
+            if version is None or version != self._version:
+                self._load(version=version)
+            return list(self._options.get(option_type, {}))
+
+    def add(self, option_type: str, option: str) -> None:
+        with self._lock:
+            self._options.setdefault(option_type, {})[option] = None
+
+    def remove(self, option_type: str, option: str) -> None:
+        with self._lock:
+            self._options.get(option_type, {}).pop(option, None)
+
+
 class mediaRanker:
     def __init__(self, dbMan) -> None:
         """ Initializes a mediaRanker object. Args: dbMan_ops: The database operations object. """
         self.dbMan_ops: Any = dbMan
         self.error_logger = ErrorLogger()
+        self.optionCatalogue = OptionCatalogue(dbMan=dbMan)
+        self.optionCatalogue.initialize()
+        self.suggestions: Optional[SuggestionEngine] = None
+
+    SUGGESTION_FIELDS: Tuple[str, ...] = ("soureceFileName", "FileRes") + OPTION_TYPES
+    REMOVE_OPTION_QUERY: str = "UPDATE options SET {column} = NULL WHERE {column} = ?"
+
+    def loadSuggestions(self) -> None:
+        """Build the suggestion engine from the decided media rows, oldest first."""
+        columns: str = ", ".join(self.SUGGESTION_FIELDS)
+        rows: List[Tuple] = self.dbMan_ops.executeGETQuery(query=f"SELECT {columns} FROM media WHERE _Type IS NOT NULL ORDER BY rowid")
+        self.suggestions = SuggestionEngine.fromRows(rows=(dict(zip(self.SUGGESTION_FIELDS, row)) for row in rows),
+                                                     weights=CONFIG.get("suggestion_weights"),
+                                                     recencyHalfLife=CONFIG.get("suggestion_recency_half_life", 200.0))
+
+    def recordDecision(self, media_file) -> None:
+        """Feed a committed decision back into the suggestion engine."""
+        if self.suggestions is not None:
+            self.suggestions.observe(record={field: getattr(media_file, field, None) for field in self.SUGGESTION_FIELDS})
 
 
     def getUserChoices(self, option_type: str, allow_new: bool = True, mediaFile: Optional[str] = None) -> List[str]:
         options: list[str] = self.getOptions(option_type=option_type)
+        if self.suggestions is not None and option_type in OPTION_TYPES and mediaFile is not None:
+            context: dict[str, Any] = {field: getattr(mediaFile, field, None) for field in self.SUGGESTION_FIELDS}
+            options = self.suggestions.rank(option_type=option_type, options=options, context=context)
         previous_selection: list[str] = []  # Store the previous selection
         media_file: str = mediaFile if mediaFile is not None else "default_or_fetched_value"
         while True:
             choices: list[str] = options + ["1)New", "2)Back", "3)Skip", "4)Delete", "5)Exit"]
             questions = [inquirer.List(name=option_type, message=f"Select {option_type}", choices=choices)]
-            answer: dict[Any, Any] | None = inquirer.prompt(questions=questions)
+            with interactivePrompt():
+                answer: dict[Any, Any] | None = inquirer.prompt(questions=questions)
             if answer is not None:
                 selected = answer[option_type]
                 if selected == "5)Exit":
@@ -198,16 +843,19 @@ class mediaRanker:
                 if selected == "4)Delete":
                     if option_to_delete := self.prompt_for_option_to_delete(options=options):
                         self.deleteOptionHandling(media_file=media_file)
+                        self.removeOption(column=option_type, option=option_to_delete)
                         options.remove(option_to_delete)
                 elif selected == "3)Skip":
                     self.skipOptionHandling(media_file=media_file)
+                    raise SkipFile(str(object=media_file.sourceFilePath))
                 elif selected == "2)Back":
                     if previous_selection:
                         return previous_selection  # Go back to the previous level
                     p.print("[sW]You are at the [sB]top[/] level. Cannot go back further.[/]",end="\n",)
                     l.info(msg="")
                 elif selected == "1)New" and allow_new:
-                    new_option: str = input(f"Enter new {option_type}: ").strip()
+                    with interactivePrompt():
+                        new_option: str = input(f"Enter new {option_type}: ").strip()
                     if new_option and self.validateUserInput(option=new_option):
                         if new_option not in options:
                             # table: Literal['options', 'media'] = "options" if option_type in ['_Category', '_Tag', '_Type'] else "media"
@@ -237,7 +885,8 @@ class mediaRanker:
 
     def prompt_for_option_to_delete(self, options):
         questions = [inquirer.List('delete_option', message="Select option to delete", choices=options)]
-        answer = inquirer.prompt(questions)
+        with interactivePrompt():
+            answer = inquirer.prompt(questions)
         return answer['delete_option'] if answer else None
 
     def deleteOptionHandling(self, media_file):
@@ -256,9 +905,7 @@ class mediaRanker:
 
     def getOptions(self, option_type: str) -> list[str]:
         if option_type in {'_Category', '_Tag', '_Type'}:
-            query: str = f"SELECT DISTINCT {option_type} FROM options"
-            results = self.dbMan_ops.executeGETQuery(query=query)
-            return [row[0] for row in results if row[0]]  # Exclude None or empty values
+            return self.optionCatalogue.get(option_type=option_type)
         elif option_type == '_Rating':
             return [str(object=i) for i in range(1, 6)]  # Convert integers to strings
             # return list(range(1, 6))  # Return a list of ratings from 1 to 10
@@ -300,7 +947,8 @@ class mediaRanker:
             try:
                 options_query: str = f"INSERT INTO options ({column}) VALUES (?) ON CONFLICT ({column}) DO NOTHING"
                 options_params: tuple[str] = (option,)
-                self.dbMan_ops.executePOSTQuery(options_query, options_params)
+                if self.dbMan_ops.executePOSTQuery(options_query, options_params):
+                    self.optionCatalogue.add(option_type=column, option=option)
             except Exception as e:
                 l.error(msg=f"Failed to update {table_name} table with new option '{option}' for {column}: {e}")
                 self.error_logger.handle_error(error=e)
@@ -309,10 +957,20 @@ class mediaRanker:
             l.error(msg=f"Unknown table name: {table_name}")
             return
 
+    def removeOption(self, column: str, option: str) -> None:
+        """Remove an option from the options table and the catalogue."""
+        if column not in OptionCatalogue.OPTION_TYPES:
+            return
+        if self.dbMan_ops.executePOSTQuery(self.REMOVE_OPTION_QUERY.format(column=column), (option,)):
+            self.optionCatalogue.remove(option_type=column, option=option)
+        else:
+            l.error(msg=f"Failed to remove option '{option}' from {column}")
+
     def getRating(self) -> int:
         while True:
             try:
-                userInput = int(input("Rate the file (1-5): "))
+                with interactivePrompt():
+                    userInput = int(input("Rate the file (1-5): "))
                 rating: int = min(5, max(1, userInput))  # Ensures rating is within 1 to 5
                 return rating
             except ValueError:
@@ -327,25 +985,128 @@ class Utility:
             db_path.touch()
 
     @staticmethod
-    def ZZZ() -> None:
-        time.sleep(random.randint(a=1, b=3))
+    def retryWhileLocked(operation, timeout: float = 10.0, interval: float = 0.05) -> Any:
+        """ Run operation, retrying with backoff while the file is still held open by another process.
+        Args: operation: Zero-argument callable doing the file operation.
+              timeout (float): Give up and re-raise after this many seconds.
+        Returns: Any: Whatever operation returns."""
+        deadline: float = time.monotonic() + timeout
+        while True:
+            try:
+                return operation()
+            except PermissionError:  # Windows reports a sharing violation for files VLC still has open
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(interval)
+                interval = min(interval * 2, 0.5)
+
+class IndexManager:
+    """ Creates and verifies the indexes listed in CONFIG["db_indexes"] on every start.
+    The applied index version is kept in PRAGMA user_version; when the configured version is newer, managed
+    indexes (ix_/ux_ prefix) that are no longer configured are dropped. A unique index that cannot be built
+    because of duplicate rows is replaced by a plain index and the duplicates are reported."""
+
+    MANAGED_PREFIXES: tuple[str, ...] = ("ix_", "ux_")
+    INTENTIONAL_SCANS: frozenset[str] = frozenset({"OptionCatalogue.load"})  # read whole tables by design
+
+    @staticmethod
+    def hotQueries() -> dict[str, str]:
+        """The statements run per file or per prompt, taken from the classes that execute them."""
+        return {
+            "check_ifRecordExists": FileProcessor.RECORD_EXISTS_QUERY,
+            "updateRecord": DatabaseManager.UPDATE_RECORD_QUERY,
+            "updateMediaFilenameAndLocation": DatabaseManager.UPDATE_LOCATION_QUERY,
+            "verifyUpdate": DatabaseManager.VERIFY_UPDATE_QUERY,
+            "OptionCatalogue.load": OptionCatalogue.LOAD_QUERY,
+            "removeOption(_Tag)": mediaRanker.REMOVE_OPTION_QUERY.format(column="_Tag"),
+        }
+
+    def __init__(self, indexes: Optional[list[dict[str, Any]]] = None, version: int = DB_INDEX_VERSION) -> None:
+        self.indexes: list[dict[str, Any]] = indexes if indexes is not None else DEFAULT_DB_INDEXES
+        self.version: int = version
+        self.error_logger = ErrorLogger()
+
+    def apply(self, dbConnection: sqlite3.Connection) -> None:
+        """Create missing indexes, drop obsolete ones on a version bump and record the applied version."""
+        existing: dict[str, str] = {name: table for name, table in dbConnection.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL")}
+        appliedVersion: int = dbConnection.execute("PRAGMA user_version").fetchone()[0]
+        if appliedVersion < self.version:
+            configured: set[str] = {index["name"] for index in self.indexes}
+            for name in existing:
+                if name.startswith(self.MANAGED_PREFIXES) and name not in configured:
+                    l.info(msg=f"Dropping obsolete index {name}")
+                    dbConnection.execute(f"DROP INDEX IF EXISTS {name}")
+        for index in self.indexes:
+            if index["name"] not in existing:
+                self.createIndex(dbConnection=dbConnection, index=index)
+        if appliedVersion != self.version:
+            dbConnection.execute(f"PRAGMA user_version = {int(self.version)}")
+
+    def createIndex(self, dbConnection: sqlite3.Connection, index: dict[str, Any]) -> None:
+        columns: str = ", ".join(index["columns"])
+        table: str = index["table"]
+        try:
+            if index.get("unique"):
+                duplicates = dbConnection.execute(
+                    f"SELECT {columns}, COUNT(*) FROM {table} GROUP BY {columns} HAVING COUNT(*) > 1 LIMIT 5").fetchall()
+                if duplicates:
+                    fallback: str = "ix_" + index["name"].removeprefix("ux_")
+                    l.error(msg=f"Cannot create unique index {index['name']}: duplicate {columns} in {table}, e.g. {duplicates}. "
+                                f"Creating non-unique {fallback} instead")
+                    dbConnection.execute(f"CREATE INDEX IF NOT EXISTS {fallback} ON {table} ({columns})")
+                    return
+            unique: str = "UNIQUE " if index.get("unique") else ""
+            l.info(msg=f"Creating {unique}index {index['name']} on {table} ({columns})")
+            dbConnection.execute(f"CREATE {unique}INDEX IF NOT EXISTS {index['name']} ON {table} ({columns})")
+        except Exception as e:
+            l.error(msg=f"Error creating index {index.get('name')}")
+            self.error_logger.handle_error(error=e)
+
+    def explainQueryPlans(self, dbConnection: sqlite3.Connection) -> dict[str, list[str]]:
+        """Log the query plan of every hot query and warn about full table scans that are not intentional."""
+        plans: dict[str, list[str]] = {}
+        for name, query in self.hotQueries().items():
+            params: tuple[str, ...] = ("",) * query.count("?")
+            try:
+                details: list[str] = [row[3] for row in dbConnection.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+            except sqlite3.Error as e:
+                l.error(msg=f"Could not explain {name}: {e}")
+                continue
+            plans[name] = details
+            if any(detail.startswith("SCAN") and "INDEX" not in detail for detail in details):
+                if name in self.INTENTIONAL_SCANS:
+                    l.info(msg=f"Query plan for {name} is an intentional full table scan: {details}")
+                else:
+                    l.warning(msg=f"Query plan for {name} is a full table scan: {details}")
+            else:
+                l.info(msg=f"Query plan for {name}: {details}")
+        return plans
+
 
 class DatabaseConnection:
     def __init__(self, db_file: str) -> None:
         self.db_file: str = db_file
         self.error_logger = ErrorLogger()
+        self.pool = ConnectionPool(db_file=db_file, pragmas=CONFIG.get("db_pragmas"))
 
 
     def getDBConnection(self) -> sqlite3.Connection | None:
-        """Establish and return a database connection.
+        """Return the calling thread's pooled database connection.
         Returns: sqlite3.Connection | None: The database connection object if successful, None otherwise."""
         try:
-            return sqlite3.connect(database=self.db_file)
+            return self.pool.getConnection()
         except Exception as e:
             l.error(msg="Error connecting to database")
             self.error_logger.handle_error(error=e)
             return None
 
+    def closeDB(self) -> None:
+        """Close the pooled connections and log the pool statistics.
+        Waits up to db_close_timeout seconds for the worker threads still holding connections to finish."""
+        l.info(msg=f"Connection pool stats: {self.pool.stats()}")
+        self.pool.closeAll(timeout=CONFIG.get("db_close_timeout", 5.0))
+
     def initializeDB(self) -> None:  # sourcery skip: extract-method
         """ Initializes the database by creating tables and adding columns to existing records.
         Raises: Exception: If there is an error initializing the database."""
@@ -372,6 +1133,11 @@ class DatabaseConnection:
                 else:
                     l.info("Database: options initialized successfully")
 
+                indexManager = IndexManager(indexes=CONFIG.get("db_indexes"), version=CONFIG.get("db_index_version", DB_INDEX_VERSION))
+                indexManager.apply(dbConnection=dbConnection)
+            if CONFIG.get("explain_query_plans", False):
+                indexManager.explainQueryPlans(dbConnection=dbConnection)
+
         except Exception as e:
             l.error(msg="Error initializing database")
             self.error_logger.handle_error(error=e)
@@ -380,7 +1146,7 @@ class DatabaseConnection:
         """Create an options table to store available categories, file tags, and types."""
         try:
             cursor: sqlite3.Cursor = dbConnection.cursor()
-            cursor.execute(OPTIONS_dbSchema)
+            cursor.execute(CONFIG["db_schema"]["options"])
         except Exception as e:
             l.error(msg="Error creating options table")
             self.error_logger.handle_error(error=e)
@@ -389,8 +1155,9 @@ class DatabaseConnection:
         """Create database tables based on the schema in the CONFIG."""
         try:
             cursor: sqlite3.Cursor = dbConnection.cursor()
-            l.info(msg=f"Creating media table with schema {MEDIA_dbSchema}")
-            cursor.execute(MEDIA_dbSchema)
+            schema: str = CONFIG["db_schema"]["media"]
+            l.info(msg=f"Creating media table with schema {schema}")
+            cursor.execute(schema)
         except Exception as e:
             l.error(msg="Error creating media table")
             self.error_logger.handle_error(error=e)
@@ -410,7 +1177,7 @@ class DatabaseConnection:
         cursor: sqlite3.Cursor = dbConnection.cursor()
         all_successful = True
         table = "media"
-        for statement in MEDIA_dbAlterStatements:
+        for statement in CONFIG["alter_statements"]:
             try:
                 l.info(f"Adding columns to media table {statement}")
                 media_column_name: str = self.getColumnName(statement=statement)
@@ -433,12 +1200,12 @@ class DatabaseConnection:
             l.error(msg="Not all columns were successfully added")
 
         table = "options"
-        for statement in OPTIONS_dbAlter_Statements:
+        for statement in CONFIG["alter_option_statements"]:
             try:
                 l.info(f"Adding columns to options table {statement}")
                 options_column_name: str = self.getColumnName(statement=statement)
             except Exception as e:
-                l.error(msg="Error In addColumnsToTable OPTIONS_dbAlter_Statements:")
+                l.error(msg="Error In addColumnsToTable alter_option_statements:")
                 self.error_logger.handle_error(error=e)
                 continue
             try:
@@ -486,11 +1253,9 @@ class DatabaseManager:
             if conn is None:
                 raise ConnectionError("Failed to get database connection")
 
-            cursor: sqlite3.Cursor = conn.cursor()
-            cursor.execute(query, params)
+            with conn:
+                conn.execute(query, params)
             # l.info(msg=f"Successfully executed POST query: {query} with params: {params}")
-            conn.commit()
-
             return True
         except Exception as e:
             l.error(msg="Error executing POST query")
@@ -508,36 +1273,47 @@ class DatabaseManager:
             self.error_logger.handle_error(error=e)  # Using ErrorLogger to handle exceptions
             return []
 
+    UPDATE_RECORD_QUERY = """
+        UPDATE media SET
+            destFileName = ?,
+            destFilePath = ?,
+            _Category = ?,
+            _Tag = ?,
+            _Type = ?,
+            _Rating = ?,
+            FileRes = ?,
+            _Processed = ?,
+            FileSize = ?,
+            Count = Count + 1
+        WHERE sourceFilePath = ?
+    """
+
+    UPDATE_LOCATION_QUERY = """
+        UPDATE media
+        SET destFilePath = ?, destFileName = ?
+        WHERE sourceFilePath = ?
+    """
+    VERIFY_UPDATE_QUERY = "SELECT destFilePath, destFileName FROM media WHERE sourceFilePath = ?"
+
+    @staticmethod
+    def updateRecordParams(media_file, new_file_location, new_file_name) -> tuple:
+        return (
+            new_file_name,
+            str(object=new_file_location),
+            media_file._Category,
+            media_file._Tag,
+            media_file._Type,
+            media_file._Rating,
+            media_file.FileRes,
+            media_file._Processed,
+            media_file.FileSize,
+            str(object=media_file.sourceFilePath))
+
     def updateRecord(self, media_file, new_file_location, new_file_name):
         """Update media record in the database."""
         try:
-            query = """
-                UPDATE media SET
-                    destFileName = ?,
-                    destFilePath = ?,
-                    _Category = ?,
-                    _Tag = ?,
-                    _Type = ?,
-                    _Rating = ?,
-                    FileRes = ?,
-                    _Processed = ?,
-                    FileSize = ?,
-                    Count = Count + 1
-                WHERE sourceFilePath = ?
-            """
-            params = (
-                new_file_name,
-                str(object=new_file_location),
-                media_file._Category,
-                media_file._Tag,
-                media_file._Type,
-                media_file._Rating,
-                media_file.FileRes,
-                media_file._Processed,
-                media_file.FileSize,
-                str(object=media_file.sourceFilePath))
-
-            success: bool = self.executePOSTQuery(query=query, params=params)
+            params = self.updateRecordParams(media_file=media_file, new_file_location=new_file_location, new_file_name=new_file_name)
+            success: bool = self.executePOSTQuery(query=self.UPDATE_RECORD_QUERY, params=params)
             if not success:
                 l.error(msg="Failed to update the record.")
             return success
@@ -546,6 +1322,23 @@ class DatabaseManager:
             self.error_logger.handle_error(error=e)  # Using ErrorLogger to handle exceptions
             return False
 
+    def bulkUpdateRecords(self, records) -> bool:
+        """ Write the final records of a batch in one transaction; either every row is updated or none is.
+        Args: records: Iterable of (media_file, new_file_location, new_file_name) as passed to updateRecord.
+        Returns: bool: True if the transaction committed."""
+        try:
+            conn: sqlite3.Connection | None = self.db_conn.getDBConnection()
+            if conn is None:
+                raise ConnectionError("Failed to get database connection")
+            with conn:
+                conn.executemany(self.UPDATE_RECORD_QUERY, (self.updateRecordParams(media_file=media_file, new_file_location=location, new_file_name=name)
+                                                            for media_file, location, name in records))
+            return True
+        except Exception as e:
+            l.error(msg="Error bulkUpdateRecords - Returning False")
+            self.error_logger.handle_error(error=e)
+            return False
+
     def insertInitialRecord(self, media_file) -> bool:
         # sourcery skip: extract-method
         try:
@@ -561,6 +1354,35 @@ class DatabaseManager:
             self.error_logger.handle_error(error=e)
             return False
 
+    def bulkIngestFiles(self, filepaths) -> set[str] | None:
+        """ Register all scanned files in the media table in one transaction.
+        The paths are diffed against media through a temp table; only unknown paths are inserted.
+        Args: filepaths: Iterable of scanned file paths.
+        Returns: set[str] | None: The paths that were already present in the media table, None if the ingest failed."""
+        paths: list[str] = list(dict.fromkeys(str(object=fp) for fp in filepaths))
+        if not paths:
+            return set()
+        try:
+            conn: sqlite3.Connection | None = self.db_conn.getDBConnection()
+            if conn is None:
+                raise ConnectionError("Failed to get database connection")
+            with conn:
+                conn.execute("CREATE TEMP TABLE IF NOT EXISTS scan_paths (sourceFilePath TEXT PRIMARY KEY)")
+                conn.execute("DELETE FROM scan_paths")
+                conn.executemany("INSERT OR IGNORE INTO scan_paths (sourceFilePath) VALUES (?)", ((path,) for path in paths))
+                known: set[str] = {row[0] for row in conn.execute(
+                    "SELECT s.sourceFilePath FROM scan_paths s JOIN media m ON m.sourceFilePath = s.sourceFilePath")}
+                conn.executemany(
+                    "INSERT INTO media (fileId, sourceFilePath, soureceFileName, Count) VALUES (?, ?, ?, ?)",
+                    ((random.randint(1, 999999), path, Path(path).name, 0) for path in paths if path not in known))
+                conn.execute("DELETE FROM scan_paths")
+            l.info(msg=f"Ingested {len(paths) - len(known)} new files, {len(known)} already known")
+            return known
+        except Exception as e:
+            l.error(msg="Error bulkIngestFiles - Returning None")
+            self.error_logger.handle_error(error=e)
+            return None
+
     def markFileAsDeleted(self, media_file) -> bool:
         try:
             query = "UPDATE media SET _Deleted = 1 WHERE sourceFilePath = ?"
@@ -580,8 +1402,7 @@ class DatabaseManager:
 
     def verifyUpdate(self, source_file_path):
         try:
-            query = "SELECT destFilePath, destFileName FROM media WHERE sourceFilePath = ?"
-            result = self.executeGETQuery(query, (source_file_path,))
+            result = self.executeGETQuery(self.VERIFY_UPDATE_QUERY, (source_file_path,))
             # l.info(f"Verification result for {source_file_path}: {result}")
         except Exception as e:
             l.error(msg="Error verifying update")
@@ -589,11 +1410,7 @@ class DatabaseManager:
 
     def updateMediaFilenameAndLocation(self, media_file, new_file_location, new_file_name) -> bool:
         try:
-            query = """
-                UPDATE media
-                SET destFilePath = ?, destFileName = ?
-                WHERE sourceFilePath = ?
-            """
+            query: str = self.UPDATE_LOCATION_QUERY
             new_file_location_str = str(object=new_file_location)
             source_file_path_str = str(object=media_file.sourceFilePath)
             params = (new_file_location_str, new_file_name, source_file_path_str)
@@ -604,78 +1421,75 @@ class DatabaseManager:
             self.error_logger.handle_error(error=e)
             return False
 
-    def getQuery_printTable(self, query: str, tableName: str) -> None:
-        """Print the database table based on the provided query."""
-        if tableName == 'media':
-            query = f"{query}{tableName}"
-            try:
-                l.info(msg=f"Executing query: {query}")
-                getMediaTableData = self.executeGETQuery(query=query)
-                mediaTable = Table(show_header=True, header_style="bold green")
-                mediaTable.add_column(header="ID", justify="center")
-                mediaTable.add_column(header="fileId", justify="center")
-                mediaTable.add_column(header="Count", justify="center")
-                mediaTable.add_column(header="destFileName", justify="center")
-                mediaTable.add_column(header="destFilePath", justify="center")
-                mediaTable.add_column(header="_Rating", justify="center")
-                mediaTable.add_column(header="_Category", justify="center")
-                mediaTable.add_column(header="_Type", justify="center")
-                mediaTable.add_column(header="_Tag", justify="center")
-                mediaTable.add_column(header="FileRes", justify="center")
-                mediaTable.add_column(header="_Deleted", justify="center")
-                mediaTable.add_column(header="_Skipped", justify="center")
-                mediaTable.add_column(header="_Processed", justify="center")
-                mediaTable.add_column(header="FileSize", justify="center")
-                mediaTable.add_column(header="sourceFilePath", justify="center")
-                mediaTable.add_column(header="sourceFileName", justify="center")
-            # ! BURDA BURAYA BAK
-
-                for row in getMediaTableData:
-                    row_list = list(row)  # Convert tuple to list
-
-                    # Handle file size formatting
-                    file_size = row_list[13]
-                    if file_size is not None:
-                        size_mb = file_size / (1024 * 1024)
-                        size_gb = file_size / (1024 * 1024 * 1024)
-                        size_display: str = f"{size_mb:.2f} MB" if size_mb < 1024 else f"{size_gb:.2f} GB"
-                    else:
-                        size_display = "N/A"
-                    row_list[13] = size_display
-
-                    mediaTable.add_row(*[str(item) for item in row_list])  # Add the updated row to the table
-
-                p.print(mediaTable)
-            except Exception as e:
-                l.error(msg="Error getQuery_printTable media table")
-                self.error_logger.handle_error(error=e)
+    def fetchTablePage(self, tableName: str, pageSize: int, afterRowid: Optional[int] = None, where: Optional[str] = None,
+                       params: Tuple = ()) -> Tuple[List[str], List[Tuple]]:
+        """ Fetch one page of a table by keyset pagination on rowid (no OFFSET, so every page costs the same).
+        Args: where (str, optional): Extra filter with ? placeholders, e.g. "sourceFilePath = ?", bound to params.
+        Returns: (column names, rows); the first column of each row is the rowid."""
+        conn: sqlite3.Connection | None = self.db_conn.getDBConnection()
+        if conn is None:
+            raise ConnectionError("Failed to get database connection")
+        condition: str = f" AND ({where})" if where else ""
+        cursor = conn.execute(f"SELECT rowid, * FROM {tableName} WHERE rowid > ?{condition} ORDER BY rowid LIMIT ?",
+                              (afterRowid or 0, *params, pageSize))
+        rows: List[Tuple] = cursor.fetchall()
+        return [description[0] for description in cursor.description], rows
 
-
-        elif tableName == 'options':
-            query = f"{query}{tableName}"
+    @staticmethod
+    def formatFileSize(file_size) -> str:
+        if file_size is None:
+            return "N/A"
+        size_mb = file_size / (1024 * 1024)
+        size_gb = file_size / (1024 * 1024 * 1024)
+        return f"{size_mb:.2f} MB" if size_mb < 1024 else f"{size_gb:.2f} GB"
+
+    def getQuery_printTable(self, tableName: str, where: Optional[str] = None, params: Tuple = (), pageSize: Optional[int] = None,
+                            afterRowid: Optional[int] = None) -> Optional[int]:
+        """ Print one page of the media or options table; only that page is read from the DB.
+        Args: where (str, optional): Filter with ? placeholders bound to params, e.g. "sourceFilePath = ?".
+              pageSize (int, optional): Rows per page, table_page_size from the config by default.
+              afterRowid (int, optional): rowid returned for the previous page.
+        Returns: Optional[int]: The rowid to pass as afterRowid for the next page, None when there are no more rows."""
+        if tableName in ('media', 'options'):
+            pageSize = pageSize or CONFIG.get("table_page_size", 50)
             try:
-                l.info(msg=f"Executing query: {query}")
-                get_db_data = self.executeGETQuery(query=query)
-                optionsTable = Table(show_header=True, header_style="bold blue")
-                optionsTable.add_column(header="ID", justify="center")
-                optionsTable.add_column(header="_Category", justify="center")
-                optionsTable.add_column(header="_Type", justify="center")
-                optionsTable.add_column(header="_Tag", justify="center")
-                p.print(optionsTable)
+                l.info(msg=f"Reading {tableName}{f' WHERE {where}' if where else ''} (page of {pageSize} after rowid {afterRowid or 0})")
+                columns, rows = self.fetchTablePage(tableName=tableName, pageSize=pageSize + 1, afterRowid=afterRowid, where=where, params=params)
+                hasMore: bool = len(rows) > pageSize
+                rows = rows[:pageSize]
+                table = richTable.Table(show_header=True, header_style="bold green" if tableName == 'media' else "bold blue")
+                for column in columns[1:]:
+                    table.add_column(header=column, justify="center")
+                sizeColumn: Optional[int] = columns.index("FileSize") - 1 if "FileSize" in columns else None
+                for row in rows:
+                    row_list = list(row[1:])
+                    if sizeColumn is not None:
+                        row_list[sizeColumn] = self.formatFileSize(file_size=row_list[sizeColumn])
+                    table.add_row(*[str(item) for item in row_list])
+                p.print(table)
+                if hasMore:
+                    p.print(f"[{sW}]Showing {len(rows)} rows of {tableName}, more after rowid {rows[-1][0]}[/]", end="\n")
+                    return rows[-1][0]
+                return None
             except Exception as e:
-                l.error(msg="Error getQuery_printTable options table")
-                self.error_logger.handle_error(error=e)  # Using ErrorLogger to handle exceptions
+                l.error(msg=f"Error getQuery_printTable {tableName} table")
+                self.error_logger.handle_error(error=e)
+                return None
         else:
             try:
-                get_db_data = self.executeGETQuery(query=query)
+                query: str = f"SELECT * FROM {tableName}" + (f" WHERE {where}" if where else "")
+                get_db_data = self.executeGETQuery(query=query, params=params)
                 l.info(msg=f"Executing query: {query}")
                 l.info(msg=f"Following data found in unknown table: {get_db_data}")
             except Exception as e:
                 l.error(msg="Error getQuery_printTable media table")
                 self.error_logger.handle_error(error=e)  # Using ErrorLogger to handle exceptions
+            return None
 
 class FileProcessor:
-    def __init__(self, dbMan, media_ranker, media_player, dbConn) -> None:
+    RECORD_EXISTS_QUERY = "SELECT COUNT(*) FROM media WHERE sourceFilePath = ?"
+
+    def __init__(self, dbMan, media_ranker, media_player, dbConn, ingestedPaths: Optional[set[str]] = None) -> None:
         """
         Initialize the class with the given parameters.
         Args:
@@ -683,11 +1497,15 @@ class FileProcessor:
             media_ranker (Any): The media ranker object.
             media_player (Any): The media player object.
             db_conn (DatabaseConnection): The database connection object.
+            ingestedPaths (set[str], optional): Paths already registered in media by bulkIngestFiles.
         """
         self.dbMan_ops: DatabaseManager = dbMan
         self.media_ranker: Any = media_ranker
         self.media_player: Any = media_player
         self.db_connector: DatabaseConnection = dbConn
+        self.ingestedPaths: set[str] = ingestedPaths if ingestedPaths is not None else set()
+        self.commitWorker: Optional[CommitWorker] = None
+        self.nameIndex = DestinationNameIndex()
         self.error_logger = ErrorLogger()
 
     def check_ifRecordExists(self, filepath) -> bool:
@@ -695,8 +1513,7 @@ class FileProcessor:
         Args: filepath (str): The source file path to check.
         Returns: bool: True if a record exists, False otherwise."""
         try:
-            query = "SELECT COUNT(*) FROM media WHERE sourceFilePath = ?"
-            result = self.dbMan_ops.executeGETQuery(query=query, params=(str(object=filepath),))
+            result = self.dbMan_ops.executeGETQuery(query=self.RECORD_EXISTS_QUERY, params=(str(object=filepath),))
             return result is not None and result[0][0] > 0
 
         except Exception as e:
@@ -704,19 +1521,55 @@ class FileProcessor:
             self.error_logger.handle_error(error=e)
             return False
 
+    @staticmethod
+    def destinationDir(media_file, quality) -> Path:
+        return Path(CONFIG["output_folder"]) / quality / media_file._Type / media_file._Category
+
+    def reserveDestination(self, media_file, quality) -> Path:
+        """ Pick the file's destination in OUTDIR and reserve its name, so files decided alike (a batch, parallel
+        commits, two folders holding the same file name) never overwrite each other. A name reserved earlier
+        (commit retry, or journal replay via destFileName) is kept. Returns: The destination path."""
+        output_dir: Path = self.destinationDir(media_file=media_file, quality=quality)
+        if media_file.destFileName:
+            self.nameIndex.claim(output_dir, media_file.destFileName)
+        else:
+            media_file.destFileName = self.nameIndex.reserve(output_dir, f"{media_file._Tag}_{media_file._Rating}_{media_file.soureceFileName}")
+        return output_dir / media_file.destFileName
+
+    def isSourceGone(self, media_file) -> bool:
+        """ True when a commit of the file can never succeed: its source no longer exists and nothing was moved
+        to its reserved destination. Failures such as a locked file return False and are worth retrying."""
+        if media_file.sourceFilePath.exists():
+            return False
+        if not media_file.destFileName:
+            return True
+        try:
+            quality: str = media_file.getMediaQuality(FileRes=media_file.FileRes)
+        except ValueError:
+            return True
+        return not (self.destinationDir(media_file=media_file, quality=quality) / media_file.destFileName).exists()
+
     def renameAndMoveFile(self, media_file, quality) -> Tuple[Path, str]:
         """ Renames and moves the media file to a new location based on its attributes.
         Args: media_file: The media file object.
         Returns: A tuple containing the new output path and the renamed output file name."""
-        self.media_player.remove()
-        Utility.ZZZ()
-        output_dir: Any = OUTDIR / quality / media_file._Type / media_file._Category
-        output_dir.mkdir(parents=True, exist_ok=True)
-        output_file_name: str = f"{media_file._Tag}_{media_file._Rating}_{media_file.soureceFileName}"
-        output_path: Any = output_dir / output_file_name
+        output_path: Path = self.reserveDestination(media_file=media_file, quality=quality)
+        output_dir: Path = output_path.parent
+        output_file_name: str = output_path.name
 
         try:
-            media_file.sourceFilePath.rename(output_path)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            if not media_file.sourceFilePath.exists() and output_path.exists():
+                # Already moved by an earlier attempt (commit retry or journal replay)
+                media_file._Processed = True
+                return output_path, output_file_name
+            if output_path.exists():
+                # Created after the folder was indexed; os.rename would silently replace it
+                raise FileExistsError(f"Destination already exists: {output_path}")
+            # A rename on the same drive; across drives a zero-copy transfer that deletes the source last
+            Utility.retryWhileLocked(operation=lambda: move_file(media_file.sourceFilePath, output_path,
+                                                                 verify_hash=CONFIG.get("verify_transfer_hash", False)),
+                                     timeout=CONFIG.get("file_release_timeout", 10.0))
             media_file._Processed = True
             return output_path, output_file_name
         except Exception as e:
@@ -724,12 +1577,18 @@ class FileProcessor:
             self.error_logger.handle_error(error=e)
             return Path(''), ''
 
-    def processSingleFile(self, file):
-        """Process the given file by playing it, updating its attributes, and interacting with the user."""
-        media_file = MediaDetails(filepath=file)
+    def processSingleFile(self, media_file: MediaDetails, nextFile=None):
+        """Process the given file by playing it, updating its attributes, and interacting with the user.
+        nextFile, when given, is preloaded in the player so the following file starts instantly. In preview review
+        mode the next file is shown as a contact sheet rather than played, so nothing is preloaded."""
+        if not media_file.probed:
+            media_file.probe()
+        media_file.printDetails()
         wx.CallAfter(callableObj=self.media_player.play, media_file=media_file)
+        if nextFile is not None and CONFIG.get("preload_next", True) and CONFIG.get("review_mode", "play") != "preview":
+            wx.CallAfter(callableObj=self.media_player.preload, media_file=nextFile)
 
-        if not self.check_ifRecordExists(filepath=media_file.sourceFilePath):
+        if str(object=media_file.sourceFilePath) not in self.ingestedPaths and not self.check_ifRecordExists(filepath=media_file.sourceFilePath):
             self.dbMan_ops.insertInitialRecord(media_file=media_file)
 
         try:
@@ -751,8 +1610,7 @@ class FileProcessor:
             media_file._Skipped = False
             media_file.Count = 0
 
-            self.media_player.stop()
-            Utility.ZZZ()
+            self.media_player.stop(timeout=CONFIG.get("player_stop_timeout", 2.0))
 
             if not media_file.is_valid():
                 l.error(msg="Media file has missing or invalid values. Skipping database operations.")
@@ -761,46 +1619,153 @@ class FileProcessor:
             quality = media_file.FileRes
             qConversion = media_file.getMediaQuality(FileRes=quality)
             l.info(f"Quality Conversion: {qConversion}")
-            newDestPath, newFileName = self.renameAndMoveFile(media_file=media_file, quality=qConversion)
-            if newDestPath and newFileName:
-                update_successful = self.dbMan_ops.updateMediaFilenameAndLocation(
-                    media_file=media_file, new_file_location=newDestPath, new_file_name=newFileName)
-                self.dbMan_ops.verifyUpdate(str(media_file.sourceFilePath))
-                if update_successful:
-                    try:
-                        self.dbMan_ops.updateRecord(media_file=media_file, new_file_location=newDestPath, new_file_name=newFileName)
-                        p.print(f"[{sW}]Moved From:[/][{sY}] {media_file.sourceFilePath}[/]", end="\n")
-                        p.print(f"[{sW}]Moved To:[/][{sY}] {newDestPath}[/]", end="\n")
-                        typecat: str = f"[{sW}]_Type:[/][{sY}] {media_file._Type}[/] | [{sW}]_Category:[/][{sY}] {media_file._Category}[/]"
-                        tagrating: str = f"[{sW}]_Tag:[/][{sY}] {media_file._Tag}[/] | [{sW}]Rank:[/][{sY}] {media_file._Rating}[/]"
-                        p.print(f"{typecat} | {tagrating}", end="\n")
-                        if self.check_ifRecordExists(filepath=media_file.sourceFilePath):
-                            # p.print("Record updated successfully.")
-                            pass
-                    except Exception as e:
-                        l.error(msg="processSingleFile| Error during updateRecord - Returning False")
-                        self.error_logger.handle_error(error=e)
+            self.media_player.remove()
+            if self.commitWorker is not None:
+                self.reserveDestination(media_file=media_file, quality=qConversion)  # journaled with the job
+                self.commitWorker.submit(media_file=media_file, quality=qConversion)
+                return True
+            return self.commitMediaFile(media_file=media_file, quality=qConversion)
+        except SkipFile:
+            l.info(msg=f"Skipped: {media_file.sourceFilePath}")
+            media_file._Skipped = True
+            self.media_player.stop(timeout=CONFIG.get("player_stop_timeout", 2.0))
+            return False
+        except Exception as e:
+            l.error(msg="Error processing single file")
+            self.error_logger.handle_error(error=e)
+            return False
+
+    def processBatch(self, group: list[MediaDetails]) -> set[str]:
+        """ Prompt once for a group of similar files and apply the decision to all of them.
+        The first file is played as the representative. Destination names are reserved up front, then the
+        batch is committed by commitBatch, as one journaled job on the CommitWorker when async_commit is on.
+        Returns: set[str]: Source paths of the files that were moved and recorded (or queued for the CommitWorker)."""
+        representative: MediaDetails = group[0]
+        p.print("*" * 50, style="green", end="\n")
+        p.print(f" [{sW}]Batch of[/][{sY}] {len(group)}[/][{sW}] files[/]", end="\n")
+        for media_file in group:
+            p.print(f"  [{sB}]{media_file.sourceFilePath}[/] | [{sR}]{media_file.Quality}[/]", end="\n")
+        p.print("*" * 50, style="green", end="\n")
+        wx.CallAfter(callableObj=self.media_player.play, media_file=representative)
+
+        for media_file in group:
+            if str(object=media_file.sourceFilePath) not in self.ingestedPaths and not self.check_ifRecordExists(filepath=media_file.sourceFilePath):
+                self.dbMan_ops.insertInitialRecord(media_file=media_file)
+
+        try:
+            for attribute in ("_Type", "_Category", "_Tag"):
+                user_input = self.media_ranker.getUserChoices(option_type=attribute, allow_new=True, mediaFile=representative)
+                setattr(representative, attribute, user_input[0] if user_input else None)
+            representative._Rating = self.media_ranker.getRating()
+            self.media_player.stop(timeout=CONFIG.get("player_stop_timeout", 2.0))
+            self.media_player.remove()
+        except SkipFile:
+            l.info(msg=f"Skipped batch of {len(group)} files")
+            for media_file in group:
+                media_file._Skipped = True
+            self.media_player.stop(timeout=CONFIG.get("player_stop_timeout", 2.0))
+            return set()
+        except Exception as e:
+            l.error(msg="Error processing batch")
+            self.error_logger.handle_error(error=e)
+            return set()
+
+        for media_file in group:
+            for attribute in ("_Type", "_Category", "_Tag", "_Rating"):
+                setattr(media_file, attribute, getattr(representative, attribute))
+            media_file._Deleted = False
+            media_file._Processed = False
+            media_file._Skipped = False
+        ready: list[MediaDetails] = []
+        for media_file in group:
+            if not media_file.is_valid():
+                continue
+            try:
+                self.reserveDestination(media_file=media_file, quality=media_file.getMediaQuality(FileRes=media_file.FileRes))
+            except ValueError:
+                l.error(msg=f"Unknown resolution {media_file.FileRes} for {media_file.sourceFilePath}")
+                continue
+            ready.append(media_file)
+        if not ready:
+            return set()
+        if self.commitWorker is not None:
+            self.commitWorker.submitBatch(media_files=ready)
+            return {str(object=media_file.sourceFilePath) for media_file in ready}
+        return self.commitBatch(media_files=ready)
+
+    def commitBatch(self, media_files: list[MediaDetails]) -> set[str]:
+        """ Move the files of a batch in parallel and write all their DB rows in one transaction.
+        Safe to repeat: files already at their reserved destination are recorded without moving again.
+        Returns: set[str]: Source paths of the files that were moved and recorded."""
+        moved: list[tuple[MediaDetails, Path, str]] = self.moveFiles(media_files=media_files)
+        if not moved:
+            return set()
+        if not self.dbMan_ops.bulkUpdateRecords(records=moved):
+            l.error(msg=f"Failed to record batch of {len(moved)} moved files")
+            return set()
+        for media_file, _, _ in moved:
+            try:
+                self.media_ranker.recordDecision(media_file=media_file)
+            except Exception as e:
+                # The rows are committed; failing the batch here would make a retry count them again
+                self.error_logger.handle_error(error=e)
+        first: MediaDetails = media_files[0]
+        p.print(f"[{sW}]Moved[/][{sY}] {len(moved)}/{len(media_files)}[/][{sW}] files as[/][{sY}] {first._Type} / "
+                f"{first._Category} / {first._Tag} / {first._Rating}[/]", end="\n")
+        return {str(object=media_file.sourceFilePath) for media_file, _, _ in moved}
+
+    def moveFiles(self, media_files: list[MediaDetails]) -> list[tuple[MediaDetails, Path, str]]:
+        """Run renameAndMoveFile for several files in parallel and return (media_file, path, name) for each success."""
+
+        def move(media_file: MediaDetails) -> Optional[tuple[MediaDetails, Path, str]]:
+            try:
+                quality: str = media_file.getMediaQuality(FileRes=media_file.FileRes)
+            except ValueError:
+                l.error(msg=f"Unknown resolution {media_file.FileRes} for {media_file.sourceFilePath}")
+                return None
+            newDestPath, newFileName = self.renameAndMoveFile(media_file=media_file, quality=quality)
+            return (media_file, newDestPath, newFileName) if newDestPath and newFileName else None
+
+        with ThreadPoolExecutor(max_workers=max(1, CONFIG.get("batch_move_workers", 4)), thread_name_prefix="move") as executor:
+            return [result for result in executor.map(move, media_files) if result is not None]
+
+    def commitMediaFile(self, media_file: MediaDetails, quality: str) -> bool:
+        """Move the decided file into OUTDIR and write its final DB record."""
+        newDestPath, newFileName = self.renameAndMoveFile(media_file=media_file, quality=quality)
+        if newDestPath and newFileName:
+            update_successful = self.dbMan_ops.updateMediaFilenameAndLocation(
+                media_file=media_file, new_file_location=newDestPath, new_file_name=newFileName)
+            self.dbMan_ops.verifyUpdate(str(media_file.sourceFilePath))
+            if update_successful:
+                try:
+                    if not self.dbMan_ops.updateRecord(media_file=media_file, new_file_location=newDestPath, new_file_name=newFileName):
                         return False
-                    # l.info(msg=f"File processing result: {media_file}")
-                    return True
-                else:
-                    l.error(msg="processSingleFile| Error during updateRecord - Returning False")
+                    self.media_ranker.recordDecision(media_file=media_file)
+                    p.print(f"[{sW}]Moved From:[/][{sY}] {media_file.sourceFilePath}[/]", end="\n")
+                    p.print(f"[{sW}]Moved To:[/][{sY}] {newDestPath}[/]", end="\n")
+                    typecat: str = f"[{sW}]_Type:[/][{sY}] {media_file._Type}[/] | [{sW}]_Category:[/][{sY}] {media_file._Category}[/]"
+                    tagrating: str = f"[{sW}]_Tag:[/][{sY}] {media_file._Tag}[/] | [{sW}]Rank:[/][{sY}] {media_file._Rating}[/]"
+                    p.print(f"{typecat} | {tagrating}", end="\n")
+                except Exception as e:
+                    l.error(msg="commitMediaFile| Error during updateRecord - Returning False")
+                    self.error_logger.handle_error(error=e)
                     return False
+                # l.info(msg=f"File processing result: {media_file}")
+                return True
             else:
-                l.error(msg="Failed to move and rename the file")
+                l.error(msg="commitMediaFile| Error during updateRecord - Returning False")
                 return False
-        except Exception as e:
-            l.error(msg="Error processing single file")
-            self.error_logger.handle_error(error=e)
+        else:
+            l.error(msg="Failed to move and rename the file")
             return False
 
     def gracefulShutdown(self) -> None:
         """Gracefully shutdown the application, make sure DB does not get corrupted."""
         l.info(msg="Gracefully shutting down the application")
-        connection: sqlite3.Connection | None = self.db_connector.getDBConnection()
-        if connection is not None:
-            connection.close()
-            l.info(msg="Database connection closed")
+        if self.commitWorker is not None:
+            self.commitWorker.drain()
+        self.db_connector.closeDB()
+        l.info(msg="Database connection closed")
         l.info(msg="Application shutdown successfully")
         sys.exit(0)
 
@@ -817,76 +1782,238 @@ class FileProcessor:
             return False
 
 
-def processFiles(dbMan, media_ranker, media_player, files, dbConn) -> None:
+def processFiles(dbMan, media_ranker, media_player, files: WorkQueue, dbConn, probeCache=None, ingestedPaths=None) -> None:
     try:
-        l.info(msg=f"Processing {len(files)} files")
-        processor = FileProcessor(dbMan=dbMan, media_ranker=media_ranker, media_player=media_player, dbConn=dbConn)
-        while files:
-            file = files.pop(0)
-            success: bool = processor.processSingleFile(file=file)
-            if not success:
+        l.info(msg=f"Processing files ({len(files)} queued so far)")
+        processor = FileProcessor(dbMan=dbMan, media_ranker=media_ranker, media_player=media_player, dbConn=dbConn,
+                                  ingestedPaths=ingestedPaths)
+        if CONFIG.get("async_commit", True):
+            processor.commitWorker = CommitWorker(commit=processor.commitMediaFile,
+                                                  journalPath=CONFIG.get("commit_journal", "config/commit_journal.jsonl"),
+                                                  commitBatch=processor.commitBatch, isGone=processor.isSourceGone)
+            processor.commitWorker.start()
+        previewEngine: Optional[PreviewEngine] = None
+        if CONFIG.get("review_mode", "play") == "preview":
+            previewEngine = PreviewEngine(cacheDir=CONFIG.get("preview_cache_dir", "config/previews"),
+                                          frames=CONFIG.get("preview_frames", 12), columns=CONFIG.get("preview_columns", 4),
+                                          workers=CONFIG.get("preview_workers", 2))
+        prefetcher = MediaPrefetcher(workQueue=files, lookahead=CONFIG.get("probe_lookahead", 4), workers=CONFIG.get("probe_workers", 2),
+                                     probeCache=probeCache, previewEngine=previewEngine)
+
+        def finish(media_file: MediaDetails, success: bool) -> None:
+            file = media_file.sourceFilePath
+            if media_file._Skipped:
+                files.requeue(file=file)
+            elif success:
+                files.markDone(file=file)
+            else:
                 l.info(msg=f"Failed to process file: {file}")
             try:
                 tableName = 'media'
-                dbMan.getQuery_printTable(query=f"SELECT * FROM '{tableName}' WHERE sourceFilePath = '{file}'", tableName={tableName})
+                dbMan.getQuery_printTable(tableName=tableName, where="sourceFilePath = ?", params=(str(object=file),))
 
             except Exception as e:
                 l.error(msg=f"Error printing table in processFiles: {e}")
+
+        try:
+            if batchKey := CONFIG.get("batch_key"):
+                for group in batchGroups(prefetcher=prefetcher, key=batchKey, window=CONFIG.get("batch_window", 200)):
+                    if len(group) == 1:
+                        finish(media_file=group[0], success=processor.processSingleFile(media_file=group[0]))
+                        continue
+                    done: set[str] = processor.processBatch(group=group)
+                    for media_file in group:
+                        finish(media_file=media_file, success=str(object=media_file.sourceFilePath) in done)
+            else:
+                for media_file in prefetcher:
+                    finish(media_file=media_file, success=processor.processSingleFile(media_file=media_file, nextFile=prefetcher.peek()))
+        finally:
+            prefetcher.close()
+            if previewEngine is not None:
+                previewEngine.shutdown()
+            if processor.commitWorker is not None:
+                processor.commitWorker.drain()
         l.info(msg="All files processed.")
     except Exception as e:
         l.error(msg=f"Error processFiles: {e}")
 
 
-def startPlayer(dbMan, media_ranker, dbConn) -> None:
-    l.info(msg=f"Starting player in {INDIR}")
-    all_files: list[Any] = []
-    for extension in VALID_EXTENSIONS:
-        all_files.extend(INDIR.glob(pattern=f"*{extension}"))
-
-    l.info(msg=f"Found {len(all_files)} files in {INDIR}.")
+BATCH_KEYS: dict[str, Any] = {
+    "parent": lambda media_file: str(object=media_file.sourceFilePath.parent),
+    "prefix": lambda media_file: re.split(r"[\s_\-.\d]+", media_file.sourceFilePath.stem.lower(), maxsplit=1)[0],
+    "resolution": lambda media_file: media_file.FileRes,
+    "size": lambda media_file: int(math.log2(media_file.FileSize)) if media_file.FileSize > 0 else 0,  # power-of-two size bands
+}
+
+
+def batchGroups(prefetcher: MediaPrefetcher, key: str, window: int = 200):
+    """ Group the files that are ready into batches sharing a key (see BATCH_KEYS).
+    Collects up to window files that are already probed or queued, without waiting for new ones, then yields
+    the groups in the order their first file was queued."""
+    keyFunc = BATCH_KEYS.get(key)
+    if keyFunc is None:
+        l.error(msg=f"Unknown batch key {key}, expected one of {list(BATCH_KEYS)}")
+        keyFunc = BATCH_KEYS["parent"]
+    for media_file in prefetcher:
+        ready: list[MediaDetails] = [media_file]
+        while len(ready) < window and prefetcher.peek() is not None:
+            ready.append(next(prefetcher))
+        groups: dict[Any, list[MediaDetails]] = {}
+        for ready_file in ready:
+            groups.setdefault(keyFunc(ready_file), []).append(ready_file)
+        yield from groups.values()
+
+
+def feedWorkQueue(scan, workQueue: WorkQueue, dbMan, ingestedPaths: set[str], batchSize: int = 256, closeWhenDone: bool = True) -> None:
+    """ Drain a scanMediaFiles generator into the work queue in batches, bulk-ingesting each batch first.
+    The first file is flushed on its own so playback can start while the rest of the scan is running;
+    with the shuffle order, shuffling therefore happens per batch."""
+    batch: list[ScanEntry] = []
+    found: int = 0
+
+    def flush() -> None:
+        paths: list[Path] = [entry.path for entry in batch]
+        if dbMan.bulkIngestFiles(filepaths=paths) is not None:
+            ingestedPaths.update(str(object=path) for path in paths)
+        workQueue.extend(files=paths, stats={str(object=entry.path): entry.stat for entry in batch if entry.stat})
+        batch.clear()
 
-    if len(all_files) > 0:
+    try:
+        for entry in scan:
+            batch.append(entry)
+            found += 1
+            if found == 1 or len(batch) >= batchSize:
+                flush()
+        if batch:
+            flush()
+        l.info(msg=f"Scan finished: found {found} files in {CONFIG['input_folder']}.")
+    except Exception as e:
+        l.error(msg=f"Error feeding work queue: {e}")
+    finally:
+        if closeWhenDone:
+            workQueue.close()
+
+
+def startPlayer(dbMan, media_ranker, dbConn, probeCache=None) -> None:
+    inDir, outDir = Path(CONFIG["input_folder"]), Path(CONFIG["output_folder"])
+    extensions: list[str] = CONFIG["valid_extensions"]
+    l.info(msg=f"Starting player in {inDir}")
+    workQueue = WorkQueue(order=CONFIG.get("queue_order", "shuffle"), dbMan=dbMan if CONFIG.get("resume_session", True) else None)
+    resumed: int = workQueue.restore()
+    if resumed:
+        l.info(msg=f"Resuming previous session with {resumed} queued files")
+
+    recursive: bool = CONFIG.get("scan_recursive", False)
+    watch: bool = CONFIG.get("watch_input", False)
+    scan = scanMediaFiles(root=inDir, extensions=extensions, recursive=recursive, exclude=[outDir])
+    first: Optional[ScanEntry] = next(scan, None)
+
+    if first is not None or resumed or watch:
+        ingestedPaths: set[str] = set()
+        if watch:
+            def onFileReady(entry: ScanEntry) -> None:
+                if dbMan.bulkIngestFiles(filepaths=[entry.path]) is not None:
+                    ingestedPaths.add(str(object=entry.path))
+                if workQueue.put(file=entry.path, stat=entry.stat):
+                    l.info(msg=f"New file queued: {entry.path}")
+
+            # Started before the initial scan is drained; files seen by both are de-duplicated by the queue
+            DirectoryWatcher(root=inDir, extensions=extensions, onFileReady=onFileReady, recursive=recursive,
+                             exclude=[outDir], stableSeconds=CONFIG.get("watch_stable_seconds", 3.0),
+                             pollInterval=CONFIG.get("watch_poll_interval", 2.0)).start()
+        feeder = threading.Thread(target=feedWorkQueue, name="scanner", args=(
+            itertools.chain([first] if first else [], scan), workQueue, dbMan, ingestedPaths,
+            CONFIG.get("scan_batch_size", 256), not watch))
+        feeder.start()
         media_player = mediaPlayer()
-        random.shuffle(x=all_files)
         app: Any = wx.App(False)
         file_processing_thread = threading.Thread(target=processFiles, args=(
-            dbMan, media_ranker, media_player, all_files, dbConn))
+            dbMan, media_ranker, media_player, workQueue, dbConn, probeCache, ingestedPaths))
         file_processing_thread.start()
         app.MainLoop()
+        workQueue.close()  # the player is gone: let the processing thread run out so closeDB() can close its connection
     else:
-        l.info(msg="No files to process.")
-
-
-
-
-
-def main() -> None:
+        l.info(msg=f"No files to process in {inDir}.")
+
+
+
+
+
+def runHeadless(dbMan, media_ranker, dbConn, args: argparse.Namespace, probeCache=None) -> None:
+    """Sort without the player: decisions come from a rules file and/or the decisions already in the DB."""
+    if not args.rules and not args.from_db:
+        l.error(msg="--headless needs --rules and/or --from-db")
+        return
+    rules = loadRules(path=args.rules) if args.rules else []
+    if not args.dry_run:
+        # Make rule values available as options in later interactive sessions
+        for rule in rules:
+            for option_type in OPTION_TYPES:
+                media_ranker.updateTableWithNewOption(table_name="options", column=option_type, option=str(rule.decision[option_type]))
+    root: Path = Path(args.input) if args.input else Path(CONFIG["input_folder"])
+    l.info(msg=f"Headless run in {root}{' (dry run)' if args.dry_run else ''}")
+    processor = FileProcessor(dbMan=dbMan, media_ranker=media_ranker, media_player=None, dbConn=dbConn)
+    sorter = HeadlessSorter(processor=processor,
+                            makeMediaFile=lambda entry: MediaDetails(filepath=entry.path, probeCache=probeCache, stat=entry.stat),
+                            rules=rules, dbMapping=HeadlessSorter.loadDbMapping(dbMan=dbMan) if args.from_db else None,
+                            probeWorkers=CONFIG.get("probe_workers", 2), moveWorkers=CONFIG.get("batch_move_workers", 4),
+                            dryRun=args.dry_run, batchSize=CONFIG.get("scan_batch_size", 256))
+    sorter.run(entries=scanMediaFiles(root=root, extensions=CONFIG["valid_extensions"], recursive=CONFIG.get("scan_recursive", False),
+                                      exclude=[Path(CONFIG["output_folder"])]))
+
+
+def parseArgs(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Review media files with the player and sort them into OUTDIR.")
+    parser.add_argument("--headless", action="store_true", help="Sort without the player window, from --rules and/or --from-db.")
+    parser.add_argument("--rules", help="YAML or JSON rules file for --headless.")
+    parser.add_argument("--from-db", action="store_true", help="With --headless, reuse the decision recorded for a file with the same name.")
+    parser.add_argument("--dry-run", action="store_true", help="With --headless, print the decisions without moving anything.")
+    parser.add_argument("--input", help="Folder to sort instead of input_folder from the config.")
+    return parser.parse_args(args=argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args: argparse.Namespace = parseArgs(argv=argv)
+    loadConfig()
+    if recordFile := CONFIG.get("console_record_file"):
+        p.enableExport(path=recordFile, maxBytes=CONFIG.get("console_record_max_bytes", 10 * 1024 * 1024),
+                       backupCount=CONFIG.get("console_record_backups", 5))
     errors_file = Path("1.txt")
     if errors_file.exists():
         errors_file.unlink()
     try:
-        Utility.checkDB(databaseFile=MEDIA_dbFile)
-        Utility.checkDB(databaseFile=OPTIONS_dbFile)
-        dbConnector = DatabaseConnection(db_file=MEDIA_dbFile)
+        Utility.checkDB(databaseFile=CONFIG["media_db_file"])
+        Utility.checkDB(databaseFile=CONFIG["options_db_file"])
+        dbConnector = DatabaseConnection(db_file=CONFIG["media_db_file"])
 
         dbConnector.initializeDB()
 
         dbManager = DatabaseManager(db_conn=dbConnector)
 
-        dbManager.getQuery_printTable(query="SELECT * FROM ", tableName="media")
+        dbManager.getQuery_printTable(tableName="media")
         print('\n\n')
-        dbManager.getQuery_printTable(query="SELECT * FROM ", tableName="options")
+        dbManager.getQuery_printTable(tableName="options")
         media_ranker = mediaRanker(dbMan=dbManager)
+        if CONFIG.get("suggest_options", True) and not args.headless:
+            media_ranker.loadSuggestions()
+        probeCache = ProbeCache(dbMan=dbManager, maxAgeDays=CONFIG.get("probe_cache_max_age_days", 90),
+                                maxEntries=CONFIG.get("probe_cache_max_entries", 250000))
+        probeCache.initialize()
+        probeCache.evictStale()
     except Exception as e:
         p.print(f"Error initializing database and operations: {e}", style="bold red")
         p.print_exception()
         sys.exit(1)
     try:
-        startPlayer(dbMan=dbManager, media_ranker=media_ranker, dbConn=dbConnector)
+        if args.headless:
+            runHeadless(dbMan=dbManager, media_ranker=media_ranker, dbConn=dbConnector, args=args, probeCache=probeCache)
+        else:
+            startPlayer(dbMan=dbManager, media_ranker=media_ranker, dbConn=dbConnector, probeCache=probeCache)
     except Exception as e:
         p.print(f"Application terminated due to an unexpected error: {e}", style="bold red")
         p.print_exception()
     finally:
+        dbConnector.closeDB()
         p.print("\n\nGoodbye...\n")
 
 
@@ -0,0 +1,112 @@
+# preview.py
+import hashlib
+import math
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Optional
+from setup_logger import l
+
+FINGERPRINT_BYTES = 64 * 1024
+
+
+def fileFingerprint(path: Path, stat: Optional[os.stat_result] = None) -> str:
+    """ Cache key for a media file: sha1 of its size, mtime and first/last 64 KiB.
+    Hashing a multi-GB file in full would cost more than the preview saves. """
+    stat = stat or os.stat(path)
+    digest = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}".encode())
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_BYTES))
+        if stat.st_size > FINGERPRINT_BYTES:
+            f.seek(max(FINGERPRINT_BYTES, stat.st_size - FINGERPRINT_BYTES))
+            digest.update(f.read(FINGERPRINT_BYTES))
+    return digest.hexdigest()
+
+
+class PreviewEngine:
+    """ Builds contact sheets (a grid of evenly spaced frames) for fast review without full playback.
+    Each frame is reached with a seek, so only a few frames around K seek points are decoded instead of the
+    whole file. Sheets are built in a worker pool and cached on disk as JPEGs keyed by fileFingerprint.
+    Methods:  submit(path): Future resolving to the sheet path (or None on failure).
+              build(path): Build (or fetch from cache) synchronously.
+              shutdown(): Stop the workers."""
+
+    def __init__(self, cacheDir: str | Path, frames: int = 12, columns: int = 4, thumbWidth: int = 480,
+                 workers: int = 2, jpegQuality: int = 85) -> None:
+        self.cacheDir = Path(cacheDir)
+        self.frames: int = max(1, frames)
+        self.columns: int = max(1, columns)
+        self.thumbWidth: int = thumbWidth
+        self.jpegQuality: int = jpegQuality
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="preview")
+        self._inFlight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, path: Path) -> Future:
+        key = str(path)
+        with self._lock:
+            future: Optional[Future] = self._inFlight.get(key)
+            if future is None:
+                future = self._executor.submit(self.build, Path(path))
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+                self._inFlight[key] = future
+            return future
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._inFlight.pop(key, None)
+
+    def build(self, path: Path) -> Optional[Path]:
+        try:
+            sheetPath: Path = self.cacheDir / f"{fileFingerprint(path)}_{self.frames}x{self.columns}.jpg"
+            if sheetPath.exists():
+                return sheetPath
+            self.cacheDir.mkdir(parents=True, exist_ok=True)
+            return self._render(path=path, sheetPath=sheetPath)
+        except Exception as e:
+            l.error(msg=f"Error building contact sheet for {path}: {e}")
+            return None
+
+    def _render(self, path: Path, sheetPath: Path) -> Optional[Path]:
+        import cv2  # imported on first use; only needed in preview review mode
+        import numpy as np
+        cap = cv2.VideoCapture(str(path))
+        try:
+            if not cap.isOpened():
+                raise ValueError(f"Failed to open {path}")
+            fps: float = cap.get(cv2.CAP_PROP_FPS) or 25.0
+            durationMs: float = cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps * 1000
+            if durationMs <= 0:
+                raise ValueError(f"Unknown duration for {path}")
+            thumbs: list = []
+            for i in range(self.frames):
+                timestampMs: float = durationMs * (i + 0.5) / self.frames
+                cap.set(cv2.CAP_PROP_POS_MSEC, timestampMs)
+                ok, frame = cap.read()
+                if not ok:
+                    continue
+                height, width = frame.shape[:2]
+                thumb = cv2.resize(frame, (self.thumbWidth, max(1, height * self.thumbWidth // width)), interpolation=cv2.INTER_AREA)
+                label: str = f"{int(timestampMs // 60000):02d}:{int(timestampMs // 1000 % 60):02d}"
+                cv2.putText(thumb, label, (8, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2, cv2.LINE_AA)
+                thumbs.append(thumb)
+        finally:
+            cap.release()
+        if not thumbs:
+            raise ValueError(f"No frames could be read from {path}")
+        thumbHeight: int = thumbs[0].shape[0]
+        rows: int = math.ceil(len(thumbs) / self.columns)
+        sheet = np.zeros((rows * thumbHeight, self.columns * self.thumbWidth, 3), dtype=np.uint8)
+        for i, thumb in enumerate(thumbs):
+            row, column = divmod(i, self.columns)
+            height: int = min(thumbHeight, thumb.shape[0])
+            sheet[row * thumbHeight:row * thumbHeight + height, column * self.thumbWidth:(column + 1) * self.thumbWidth] = thumb[:height]
+        tmpPath: Path = sheetPath.with_suffix(".tmp.jpg")
+        if not cv2.imwrite(str(tmpPath), sheet, [cv2.IMWRITE_JPEG_QUALITY, self.jpegQuality]):
+            raise ValueError(f"Failed to write {tmpPath}")
+        os.replace(tmpPath, sheetPath)
+        return sheetPath
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,328 @@
+# probe.py
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+READ_BUFFER = 64 * 1024  # Header parsers only ever seek and read a few bytes at a time
+DEFAULT_BACKENDS: Tuple[str, ...] = ("header", "opencv")
+
+
+class ProbeError(Exception):
+    """Raised when a backend cannot determine the resolution of a file."""
+
+
+@dataclass
+class ProbeResult:
+    width: int
+    height: int
+    duration: Optional[float] = None  # seconds, when the container states it
+    backend: str = ""
+
+    @property
+    def resolution(self) -> str:
+        return f"{self.width}x{self.height}"
+
+
+def _result(width: int, height: int, duration: Optional[float], backend: str) -> ProbeResult:
+    if width <= 0 or height <= 0:
+        raise ProbeError(f"{backend}: no video dimensions found")
+    return ProbeResult(width=int(width), height=int(height), duration=duration, backend=backend)
+
+
+# --------------------------------------------------------------------------- MP4 / MOV (ISO BMFF)
+
+def _iterBoxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (type, payloadStart, boxEnd) for every box in [start, end) without reading payloads."""
+    pos: int = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header: bytes = f.read(8)
+        if len(header) < 8:
+            return
+        size, boxType = struct.unpack(">I4s", header)
+        headerSize = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            headerSize = 16
+        elif size == 0:
+            size = end - pos
+        if size < headerSize:
+            raise ProbeError(f"mp4: corrupt box {boxType!r} at {pos}")
+        yield boxType, pos + headerSize, min(pos + size, end)
+        pos += size
+
+
+def _parseMp4(f: BinaryIO, fileSize: int) -> ProbeResult:
+    for boxType, start, end in _iterBoxes(f, 0, fileSize):
+        if boxType != b"moov":
+            continue  # mdat and friends are skipped with a single seek
+        duration: Optional[float] = None
+        dims: Optional[Tuple[int, int]] = None
+        for childType, childStart, childEnd in _iterBoxes(f, start, end):
+            if childType == b"mvhd":
+                f.seek(childStart)
+                data: bytes = f.read(32)
+                if data[:1] == b"\x01":
+                    timescale, length = struct.unpack(">IQ", data[20:32])
+                else:
+                    timescale, length = struct.unpack(">II", data[12:20])
+                duration = length / timescale if timescale else None
+            elif childType == b"trak" and dims is None:
+                for trakType, trakStart, _ in _iterBoxes(f, childStart, childEnd):
+                    if trakType != b"tkhd":
+                        continue
+                    f.seek(trakStart)
+                    data = f.read(96)
+                    offset: int = 88 if data[:1] == b"\x01" else 76
+                    width, height = struct.unpack(">II", data[offset:offset + 8])
+                    if width >> 16 and height >> 16:  # 16.16 fixed point; audio tracks are 0x0
+                        dims = (width >> 16, height >> 16)
+                    break
+        if dims is None:
+            raise ProbeError("mp4: moov has no video track")
+        return _result(dims[0], dims[1], duration, "header:mp4")
+    raise ProbeError("mp4: no moov box")
+
+
+# --------------------------------------------------------------------------- Matroska / WebM (EBML)
+
+MKV_SEGMENT = 0x18538067
+MKV_SEEKHEAD, MKV_SEEK, MKV_SEEK_ID, MKV_SEEK_POSITION = 0x114D9B74, 0x4DBB, 0x53AB, 0x53AC
+MKV_INFO, MKV_TIMECODE_SCALE, MKV_DURATION = 0x1549A966, 0x2AD7B1, 0x4489
+MKV_TRACKS, MKV_TRACK_ENTRY, MKV_TRACK_TYPE, MKV_VIDEO = 0x1654AE6B, 0xAE, 0x83, 0xE0
+MKV_PIXEL_WIDTH, MKV_PIXEL_HEIGHT = 0xB0, 0xBA
+MKV_CLUSTER = 0x1F43B675
+
+
+def _readVint(f: BinaryIO, keepMarker: bool) -> Tuple[int, int, bool]:
+    """Read an EBML variable-length integer. Returns (value, length, isUnknownSize)."""
+    first: bytes = f.read(1)
+    if not first:
+        raise ProbeError("mkv: unexpected end of file")
+    mask, length = 0x80, 1
+    while length <= 8 and not first[0] & mask:
+        mask >>= 1
+        length += 1
+    if length > 8:
+        raise ProbeError("mkv: invalid vint")
+    value: int = first[0] if keepMarker else first[0] & (mask - 1)
+    for byte in f.read(length - 1):
+        value = (value << 8) | byte
+    unknown: bool = not keepMarker and value == (1 << (7 * length)) - 1
+    return value, length, unknown
+
+
+def _iterElements(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[int, int, int, bool]]:
+    """Yield (id, dataStart, dataEnd, unknownSize) for every EBML element in [start, end)."""
+    pos: int = start
+    while pos < end:
+        f.seek(pos)
+        elementId, idLength, _ = _readVint(f, keepMarker=True)
+        size, sizeLength, unknown = _readVint(f, keepMarker=False)
+        dataStart: int = pos + idLength + sizeLength
+        dataEnd: int = end if unknown else min(dataStart + size, end)
+        yield elementId, dataStart, dataEnd, unknown
+        if unknown:
+            return  # an unknown-sized element cannot be skipped
+        pos = dataEnd
+
+
+def _readUint(f: BinaryIO, start: int, end: int) -> int:
+    f.seek(start)
+    return int.from_bytes(f.read(end - start), "big")
+
+
+def _parseMkvTracks(f: BinaryIO, start: int, end: int) -> Optional[Tuple[int, int]]:
+    for elementId, entryStart, entryEnd, _ in _iterElements(f, start, end):
+        if elementId != MKV_TRACK_ENTRY:
+            continue
+        trackType: Optional[int] = None
+        dims: Optional[Tuple[int, int]] = None
+        for childId, childStart, childEnd, _ in _iterElements(f, entryStart, entryEnd):
+            if childId == MKV_TRACK_TYPE:
+                trackType = _readUint(f, childStart, childEnd)
+            elif childId == MKV_VIDEO:
+                width = height = 0
+                for videoId, videoStart, videoEnd, _ in _iterElements(f, childStart, childEnd):
+                    if videoId == MKV_PIXEL_WIDTH:
+                        width = _readUint(f, videoStart, videoEnd)
+                    elif videoId == MKV_PIXEL_HEIGHT:
+                        height = _readUint(f, videoStart, videoEnd)
+                dims = (width, height)
+        if dims is not None and trackType in (None, 1):
+            return dims
+    return None
+
+
+def _parseMkvInfo(f: BinaryIO, start: int, end: int) -> Optional[float]:
+    scale, duration = 1_000_000, None
+    for elementId, dataStart, dataEnd, _ in _iterElements(f, start, end):
+        if elementId == MKV_TIMECODE_SCALE:
+            scale = _readUint(f, dataStart, dataEnd)
+        elif elementId == MKV_DURATION and dataEnd - dataStart in (4, 8):
+            f.seek(dataStart)
+            duration = struct.unpack(">f" if dataEnd - dataStart == 4 else ">d", f.read(dataEnd - dataStart))[0]
+    return duration * scale / 1e9 if duration is not None else None
+
+
+def _parseMkv(f: BinaryIO, fileSize: int) -> ProbeResult:
+    for elementId, segmentStart, segmentEnd, _ in _iterElements(f, 0, fileSize):
+        if elementId != MKV_SEGMENT:
+            continue
+        duration: Optional[float] = None
+        tracksAt: Optional[int] = None
+        for childId, childStart, childEnd, unknown in _iterElements(f, segmentStart, segmentEnd):
+            if childId == MKV_INFO:
+                duration = _parseMkvInfo(f, childStart, childEnd)
+            elif childId == MKV_TRACKS:
+                dims = _parseMkvTracks(f, childStart, childEnd)
+                if dims is None:
+                    break
+                return _result(dims[0], dims[1], duration, "header:mkv")
+            elif childId == MKV_SEEKHEAD:
+                tracksAt = _findMkvSeek(f, childStart, childEnd, segmentStart, MKV_TRACKS) or tracksAt
+            elif childId == MKV_CLUSTER and unknown:
+                break  # Tracks is not before the clusters; fall back to the SeekHead below
+        if tracksAt is not None:
+            for childId, childStart, childEnd, _ in _iterElements(f, tracksAt, segmentEnd):
+                if childId == MKV_TRACKS and (dims := _parseMkvTracks(f, childStart, childEnd)):
+                    return _result(dims[0], dims[1], duration, "header:mkv")
+                break
+        raise ProbeError("mkv: no video track")
+    raise ProbeError("mkv: no segment")
+
+
+def _findMkvSeek(f: BinaryIO, start: int, end: int, segmentStart: int, target: int) -> Optional[int]:
+    for elementId, seekStart, seekEnd, _ in _iterElements(f, start, end):
+        if elementId != MKV_SEEK:
+            continue
+        seekId: Optional[int] = None
+        position: Optional[int] = None
+        for childId, childStart, childEnd, _ in _iterElements(f, seekStart, seekEnd):
+            if childId == MKV_SEEK_ID:
+                seekId = _readUint(f, childStart, childEnd)
+            elif childId == MKV_SEEK_POSITION:
+                position = _readUint(f, childStart, childEnd)
+        if seekId == target and position is not None:
+            return segmentStart + position
+    return None
+
+
+# --------------------------------------------------------------------------- AVI (RIFF)
+
+def _iterChunks(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Yield (fourcc, dataStart, dataEnd) for every RIFF chunk in [start, end)."""
+    pos: int = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        chunkId, size = struct.unpack("<4sI", f.read(8))
+        yield chunkId, pos + 8, min(pos + 8 + size, end)
+        pos += 8 + size + (size & 1)
+
+
+def _parseAvi(f: BinaryIO, fileSize: int) -> ProbeResult:
+    for chunkId, start, end in _iterChunks(f, 12, fileSize):
+        if chunkId != b"LIST":
+            continue
+        f.seek(start)
+        if f.read(4) != b"hdrl":
+            continue
+        width = height = 0
+        duration: Optional[float] = None
+        for childId, childStart, childEnd in _iterChunks(f, start + 4, end):
+            if childId == b"avih":
+                f.seek(childStart)
+                usPerFrame, _, _, _, totalFrames, _, _, _, width, height = struct.unpack("<10I", f.read(40))
+                duration = totalFrames * usPerFrame / 1e6 if usPerFrame else None
+            elif childId == b"LIST":
+                f.seek(childStart)
+                if f.read(4) != b"strl":
+                    continue
+                isVideo = False
+                for streamId, streamStart, _ in _iterChunks(f, childStart + 4, childEnd):
+                    f.seek(streamStart)
+                    if streamId == b"strh":
+                        header: bytes = f.read(36)
+                        isVideo = header[:4] == b"vids"
+                        scale, rate = struct.unpack("<II", header[20:28])
+                        length: int = struct.unpack("<I", header[32:36])[0]
+                        if isVideo and rate:
+                            duration = length * scale / rate
+                    elif streamId == b"strf" and isVideo:
+                        _, biWidth, biHeight = struct.unpack("<Iii", f.read(12))
+                        return _result(biWidth, abs(biHeight), duration, "header:avi")
+        return _result(width, height, duration, "header:avi")
+    raise ProbeError("avi: no hdrl list")
+
+
+# --------------------------------------------------------------------------- backends
+
+HeaderParser = Callable[[BinaryIO, int], ProbeResult]
+
+
+def _sniff(head: bytes) -> Optional[HeaderParser]:
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return _parseMkv
+    if head[:4] == b"RIFF" and head[8:12] == b"AVI ":
+        return _parseAvi
+    if head[4:8] in (b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide"):
+        return _parseMp4
+    return None
+
+
+def probeHeader(path: Path) -> ProbeResult:
+    """ Read the resolution from the container header only (MP4/MOV tkhd, Matroska Tracks/Video, AVI strh/strf). """
+    with open(path, "rb", buffering=READ_BUFFER) as f:
+        f.seek(0, 2)
+        fileSize: int = f.tell()
+        f.seek(0)
+        parser: Optional[HeaderParser] = _sniff(f.read(12))
+        if parser is None:
+            raise ProbeError(f"header: unsupported container {path}")
+        try:
+            return parser(f, fileSize)
+        except (struct.error, IndexError) as e:
+            raise ProbeError(f"header: truncated or corrupt header in {path}: {e}") from e
+
+
+def probeOpenCV(path: Path) -> ProbeResult:
+    """ Open the file with cv2.VideoCapture. Slow, but understands anything FFmpeg does. """
+    import cv2  # imported on first fallback only; it is by far the heaviest dependency
+    cap = cv2.VideoCapture(str(path))
+    try:
+        if not cap.isOpened():
+            raise ProbeError(f"opencv: failed to open {path}")
+        fps: float = cap.get(cv2.CAP_PROP_FPS)
+        frames: float = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        return _result(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                       frames / fps if fps > 0 and frames > 0 else None, "opencv")
+    finally:
+        cap.release()
+
+
+PROBE_BACKENDS: Dict[str, Callable[[Path], ProbeResult]] = {
+    "header": probeHeader,
+    "opencv": probeOpenCV,
+}
+
+
+def registerBackend(name: str, backend: Callable[[Path], ProbeResult]) -> None:
+    """Make a probe backend available by name to probeMedia."""
+    PROBE_BACKENDS[name] = backend
+
+
+def probeMedia(path: Path, backends: Sequence[str] = DEFAULT_BACKENDS) -> ProbeResult:
+    """ Try each backend in order and return the first result.
+    Raises: ProbeError: If every backend fails."""
+    errors: List[str] = []
+    for name in backends:
+        backend = PROBE_BACKENDS.get(name)
+        if backend is None:
+            errors.append(f"unknown backend {name}")
+            continue
+        try:
+            return backend(Path(path))
+        except (ProbeError, OSError, ImportError) as e:
+            errors.append(str(e))
+    raise ProbeError("; ".join(errors) or f"no probe backend for {path}")
@@ -1,5 +1,7 @@
 # runvlc.py
 import contextlib
+import threading
+import time
 from urllib.parse import unquote
 from typing import Any
 import wx  # pylint: disable=E0401 # type: ignore
@@ -10,6 +12,8 @@ import subprocess
 
 
 class VLCMediaPlayerGUI(wx.Frame):
+    SLIDER_UPDATE_INTERVAL = 0.25  # seconds; libvlc reports time changes far more often than the slider needs
+
     def __init__(self, parent, filepath=None, title="Python VLC Media Player") -> None:
         """ Initializes the VLC Media Player object.
         Args: parent: The parent object.
@@ -19,7 +23,18 @@ class VLCMediaPlayerGUI(wx.Frame):
         self.init_ui()
         self.instance = vlc.Instance("--quiet")
         self.previous_volume = 0
-        self.player: Any = self.instance.media_player_new()  # type: ignore
+        self.stopped = threading.Event()
+        self.stopped.set()
+        self.pending_loop_stops: int = 0  # Stopped events caused by loop_media, not by a stop request
+        self.media: Any = None
+        self.media_length: int = 0
+        self.last_slider_update: float = 0.0
+        self.player: Any = self.new_player()
+        # Double buffer: the next queued file, parsed in advance and parked in its own player
+        self.next_player: Any = None
+        self.next_media: Any = None
+        self.next_filepath: str | None = None
+        self.preview: Any = None  # wx.StaticBitmap showing a contact sheet in preview review mode
         if filepath:
             self.load_media(filepath=filepath)
             self.on_play(event=None)
@@ -33,7 +48,7 @@ class VLCMediaPlayerGUI(wx.Frame):
         # self.create_video_panel()
 
     def setup_ui_components(self) -> None:
-        """ Set up the UI components for the VLC player. This method initializes and configures the various UI components such as panels, sliders, buttons, and timers."""
+        """ Set up the UI components for the VLC player. This method initializes and configures the various UI components such as panels, sliders and buttons."""
         self.pnlVideo: Any = wx.Panel(self)
         self.sldPosition: Any = wx.Slider(self, value=0, minValue=0, maxValue=100)
         self.btnPlay: Any = wx.Button(self, label="Play")
@@ -42,7 +57,6 @@ class VLCMediaPlayerGUI(wx.Frame):
         self.btnExit: Any = wx.Button(self, label="Exit")
         self.btnBrowse: Any = wx.Button(self, label="Browse")
         self.sldVolume: Any = wx.Slider(self, value=0, minValue=0, maxValue=100)
-        self.timer: Any = wx.Timer(self)
         self.layout_components()
 
     def layout_components(self) -> None:
@@ -100,7 +114,7 @@ class VLCMediaPlayerGUI(wx.Frame):
         self.SetPosition((client_area.x, client_area.y))  # Position on the left side, above taskbar
 
     def bind_event_handlers(self) -> None:
-        """ The function "bind_event_handlers" binds event handlers to various buttons, sliders, and timers in a wxPython application. """
+        """ The function "bind_event_handlers" binds event handlers to various buttons and sliders in a wxPython application. """
         self.Bind(wx.EVT_BUTTON, self.on_play, self.btnPlay)
         self.Bind(wx.EVT_BUTTON, self.on_stop, self.btnStop)
         self.Bind(wx.EVT_BUTTON, self.on_mute, self.btnMute)
@@ -109,7 +123,6 @@ class VLCMediaPlayerGUI(wx.Frame):
         self.Bind(wx.EVT_SLIDER, self.on_set_volume, self.sldVolume)
         self.Bind(wx.EVT_MOUSEWHEEL, self.on_mouse_wheel_volume, self.sldVolume)
         self.Bind(wx.EVT_MOUSEWHEEL, self.on_mouse_wheel_position, self.sldPosition)
-        self.Bind(wx.EVT_TIMER, self.on_timer, self.timer)
         self.Bind(wx.EVT_CLOSE, self.on_exit)
         self.Bind(wx.EVT_SLIDER, self.on_seek, self.sldPosition)
 
@@ -126,12 +139,69 @@ class VLCMediaPlayerGUI(wx.Frame):
     #     except Exception as e:
     #         l.error(msg=f"Error loading media: {e}")
 
+    def new_player(self) -> Any:
+        """ Create a media player wired to the GUI's libvlc events. """
+        player: Any = self.instance.media_player_new()  # type: ignore
+        events: Any = player.event_manager()
+        events.event_attach(vlc.EventType.MediaPlayerLengthChanged, self.on_length_changed, player)
+        events.event_attach(vlc.EventType.MediaPlayerTimeChanged, self.on_time_changed, player)
+        events.event_attach(vlc.EventType.MediaPlayerEndReached, self.on_end_reached, player)
+        return player
+
+    def new_media(self, filepath) -> Any:
+        """ Create a media whose state events report back with the media itself, so a late Stopped event of a
+        previous clip (or of a retired player) can be told apart from the current one. """
+        media: Any = self.instance.media_new(filepath)  # type:ignore
+        media.event_manager().event_attach(vlc.EventType.MediaStateChanged, self.on_media_state, media)
+        return media
+
+    def preload_media(self, filepath) -> None:
+        """ Parse the next file in the background and park it in a second player, so load_media can swap it in
+        instead of creating, demuxing and buffering the media after the current file is removed. """
+        if filepath == self.next_filepath:
+            return
+        try:
+            self.discard_preloaded()
+            media: Any = self.new_media(filepath=filepath)
+            media.parse_with_options(vlc.MediaParseFlag.local, 0)  # asynchronous
+            player: Any = self.new_player()
+            player.set_media(media)
+            self.next_player, self.next_media, self.next_filepath = player, media, filepath
+        except Exception as e:
+            l.error(msg=f"Error preloading media: {e}")
+
+    def discard_preloaded(self) -> None:
+        if self.next_player is not None:
+            with contextlib.suppress(Exception):
+                self.next_player.release()
+        self.next_player = self.next_media = self.next_filepath = None
+
+    def swap_in_preloaded(self) -> None:
+        """ Make the preloaded player current and release the old one. """
+        old_player: Any = self.player
+        self.player, self.media = self.next_player, self.next_media
+        self.next_player = self.next_media = self.next_filepath = None
+        with contextlib.suppress(Exception):
+            self.player.audio_set_volume(old_player.audio_get_volume())
+            self.player.audio_set_mute(old_player.audio_get_mute())
+        with contextlib.suppress(Exception):
+            old_player.stop()
+            old_player.release()
+
     def load_media(self, filepath):
         """Load and play media."""
         try:
             # self.create_video_panel()  # Ensure pnlVideo is available
-            self.media: Any = self.instance.media_new(filepath)  # type:ignore
-            self.player.set_media(self.media)
+            self.hide_preview()
+            self.stopped.clear()
+            self.pending_loop_stops = 0
+            self.media_length = 0
+            if self.next_player is not None and filepath == self.next_filepath:
+                self.swap_in_preloaded()
+            else:
+                self.discard_preloaded()
+                self.media = self.new_media(filepath=filepath)
+                self.player.set_media(self.media)
             self.player.set_hwnd(self.pnlVideo.GetHandle())
             # cp.print("#" * 10 + f" [{sY}]Playing: -->[/] [{sR}]{filepath}[/] " + "#" * 10, style="blue italic", end="\n")
             self.player.play()  # Play to get video size
@@ -139,6 +209,33 @@ class VLCMediaPlayerGUI(wx.Frame):
         except Exception as e:
             l.error(msg=f"Error loading media: {e}")
 
+    def show_preview(self, image_path, filepath) -> None:
+        """ Show a contact sheet instead of playing. The media is loaded but not started; Play hides the
+        sheet and plays the file as usual. """
+        try:
+            self.player.stop()
+            self.media = self.new_media(filepath=filepath)
+            self.stopped.clear()  # events of the previous media no longer match; wait for this one's stop
+            self.pending_loop_stops = 0
+            self.player.set_media(self.media)
+            self.player.set_hwnd(self.pnlVideo.GetHandle())
+            image: Any = wx.Image(str(image_path))
+            panel_width, panel_height = self.pnlVideo.GetClientSize()
+            scale: float = min(panel_width / image.GetWidth(), panel_height / image.GetHeight())
+            if scale > 0:
+                image = image.Scale(max(1, int(image.GetWidth() * scale)), max(1, int(image.GetHeight() * scale)), wx.IMAGE_QUALITY_HIGH)
+            if self.preview is None:
+                self.preview = wx.StaticBitmap(self.pnlVideo)
+            self.preview.SetBitmap(wx.Bitmap(image))
+            self.preview.Show()
+            self.pnlVideo.Layout()
+        except Exception as e:
+            l.error(msg=f"Error showing preview: {e}")
+
+    def hide_preview(self) -> None:
+        if self.preview is not None and self.preview.IsShown():
+            self.preview.Hide()
+
     def create_video_panel(self):
         """Create or recreate the video panel."""
         if self.pnlVideo:
@@ -179,19 +276,33 @@ class VLCMediaPlayerGUI(wx.Frame):
         if self.player.is_playing():
             self.player.pause()
         else:
+            self.hide_preview()
+            self.stopped.clear()
             self.player.play()
-            self.timer.Start(100)
 
     def on_exit(self, event) -> None:
+        self.discard_preloaded()
         self.player.stop()
-        self.timer.Stop()
         self.Destroy()
 
     def on_stop(self, event) -> None:
+        self.stopped.clear()  # before stop(): its Stopped event may arrive on the VLC thread at any point after
         self.player.stop()
-        self.timer.Stop()
         self.btnPlay.SetLabel("Play")
 
+    def on_media_state(self, event, media) -> None:
+        """ libvlc callback (VLC thread): set stopped once the current media reports Stopped. """
+        if media is not self.media or event.u.new_state != vlc.State.Stopped.value:
+            return  # a previous clip, a preloaded media, or not a stop
+        if self.pending_loop_stops > 0:
+            self.pending_loop_stops -= 1  # the stop/play restart of loop_media
+            return
+        self.stopped.set()
+
+    def wait_until_stopped(self, timeout: float) -> bool:
+        """ Block until the current media reports Stopped or timeout expires. Returns True if stopped. """
+        return self.stopped.wait(timeout)
+
     def on_mute(self, event) -> None:
         """ The `on_mute` function toggles the mute state of the player and adjusts the volume accordingly.
         :param event: The `event` parameter is an object that represents the event that triggered the `on_mute` method. """
@@ -203,15 +314,31 @@ class VLCMediaPlayerGUI(wx.Frame):
             self.previous_volume = self.sldVolume.GetValue()  # Save current volume
             self.sldVolume.SetValue(0)
 
-    def on_timer(self, event) -> None:
-        """ Event handler for the timer event. This method is called periodically by a timer to update the position of the slider based on the current playback time.
-        Args: event: The timer event object. """
-        if self.player.is_playing():
-            length: Any = self.player.get_length()
-            time: Any = self.player.get_time()
-            self.sldPosition.SetValue(int(time * 100 / length))
-        else:
-            self.on_play(event=None)  # Loop the video
+    def on_length_changed(self, event, player) -> None:
+        """ libvlc callback (VLC thread): the media length became known. """
+        if player is self.player:
+            self.media_length = event.u.new_length
+
+    def on_time_changed(self, event, player) -> None:
+        """ libvlc callback (VLC thread): move the position slider, at most every SLIDER_UPDATE_INTERVAL. """
+        now: float = time.monotonic()
+        if player is not self.player or self.media_length <= 0 or now - self.last_slider_update < self.SLIDER_UPDATE_INTERVAL:
+            return
+        self.last_slider_update = now
+        wx.CallAfter(self.sldPosition.SetValue, min(100, int(event.u.new_time * 100 / self.media_length)))
+
+    def on_end_reached(self, event, player) -> None:
+        """ libvlc callback (VLC thread): libvlc must not be called back from here, so loop on the GUI thread. """
+        if player is self.player:
+            wx.CallAfter(self.loop_media, player)
+
+    def loop_media(self, player) -> None:
+        """ Restart the media that just ended (the player cannot be replayed from the Ended state). """
+        if player is not self.player:
+            return
+        self.pending_loop_stops += 1
+        player.stop()
+        player.play()
 
     def on_set_volume(self, event) -> None:
         """ Sets the volume of the player and toggles mute if volume is 0.
@@ -0,0 +1,46 @@
+# scanner.py
+import os
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Optional
+from setup_logger import l
+
+
+class ScanEntry(NamedTuple):
+    path: Path
+    stat: Optional[os.stat_result]
+
+
+def normaliseExtensions(extensions: Iterable[str]) -> frozenset[str]:
+    """Lower-case the configured extensions and make sure they start with a dot."""
+    return frozenset(ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions)
+
+
+def scanMediaFiles(root: Path, extensions: Iterable[str], recursive: bool = False,
+                   exclude: Iterable[Path] = ()) -> Iterator[ScanEntry]:
+    """ Walk root once with os.scandir and yield matching files as they are found.
+    Extensions are matched case-insensitively against a set. The stat result of each file is carried along
+    (free on Windows, where it comes with the directory listing) so callers do not stat the file again.
+    Args: root (Path): Directory to scan.
+          extensions: Valid extensions, e.g. [".mp4", ".mkv"].
+          recursive (bool): Descend into sub-directories.
+          exclude: Directories never entered, e.g. the output folder when it lives inside the input folder."""
+    wanted: frozenset[str] = normaliseExtensions(extensions)
+    excluded: set[str] = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+    pending: list[str] = [str(root)]
+    while pending:
+        directory: str = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive and os.path.normcase(os.path.abspath(entry.path)) not in excluded:
+                                pending.append(entry.path)
+                            continue
+                        if os.path.splitext(entry.name)[1].lower() not in wanted or not entry.is_file():
+                            continue
+                        yield ScanEntry(path=Path(entry.path), stat=entry.stat())
+                    except OSError as e:
+                        l.error(msg=f"Skipping {entry.path}: {e}")
+        except OSError as e:
+            l.error(msg=f"Cannot scan {directory}: {e}")
@@ -4,7 +4,13 @@ from rich.style import Style
 from rich.traceback import install
 from rich.logging import RichHandler
 from rich.console import Console
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Callable, Iterable, Iterator, Optional
+import atexit
+import contextlib
 import logging
+import queue
+import threading
 
 # Define styles
 styles: dict[str, Style] = {
@@ -23,21 +29,133 @@ styles: dict[str, Style] = {
 # Extract style objects
 sR, sB, sG, sY, sM, sC, sW, sWB, styBlack, styHidden = styles.values()
 
+RECORD_MAX_SEGMENTS = 50_000  # segments kept by the recording console; older output is exported or dropped
+
+
+class RingBuffer(list):
+    """ A list that keeps only its newest maxlen items, used as rich's record buffer.
+    It may grow to twice maxlen before the oldest half is cut, so trimming is amortized O(1) per item.
+    onEvict receives the items that are cut, e.g. to export them before they are lost."""
+
+    def __init__(self, maxlen: int, onEvict: Optional[Callable[[list], None]] = None) -> None:
+        super().__init__()
+        self.maxlen: int = maxlen
+        self.onEvict = onEvict
+
+    def _trim(self) -> None:
+        if len(self) > 2 * self.maxlen:
+            evicted: list = self[:len(self) - self.maxlen]
+            del self[:len(self) - self.maxlen]
+            if self.onEvict is not None:
+                self.onEvict(evicted)
+
+    def append(self, item) -> None:
+        super().append(item)
+        self._trim()
+
+    def extend(self, items: Iterable) -> None:
+        super().extend(items)
+        self._trim()
+
+
+class BoundedConsole(Console):
+    """ Console(record=True) whose recording is bounded by a RingBuffer instead of growing for the whole session.
+    With enableExport() the recorded text is written to rotating files whenever it is evicted or flushed."""
+
+    def __init__(self, *args, maxSegments: int = RECORD_MAX_SEGMENTS, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._exportHandler: Optional[RotatingFileHandler] = None
+        self._record_buffer = RingBuffer(maxlen=maxSegments, onEvict=self._export)
+
+    def enableExport(self, path: str, maxBytes: int = 10 * 1024 * 1024, backupCount: int = 5) -> None:
+        self._exportHandler = RotatingFileHandler(path, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8")
+        self._exportHandler.terminator = ""
+        atexit.register(self.flushRecording)
+
+    def _export(self, segments: list) -> None:
+        if self._exportHandler is not None and segments:
+            text: str = "".join(segment.text for segment in segments if not segment.control)
+            self._exportHandler.emit(logging.makeLogRecord({"msg": text, "levelno": logging.INFO, "levelname": "INFO"}))
+
+    def flushRecording(self) -> None:
+        """Export whatever is still recorded and clear the buffer."""
+        with self._record_buffer_lock:
+            segments: list = list(self._record_buffer)
+            del self._record_buffer[:]
+        self._export(segments)
+
+
+class GatedRichHandler(RichHandler):
+    """ RichHandler for the listener thread that holds its output while a prompt owns the terminal.
+    A record carrying a flushEvent is a marker from flushLogs(): it is not rendered, its event is set once every
+    record queued before it has been written."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.gate = threading.RLock()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        if (flushEvent := getattr(record, "flushEvent", None)) is not None:
+            flushEvent.set()
+            return False
+        with self.gate:
+            return super().handle(record)
+
+
+class RecordQueueHandler(QueueHandler):
+    """QueueHandler that passes records through unformatted so RichHandler can still render rich tracebacks."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 # Configure logging
 # FORMAT = "%(funcName)s - %(lineno)d|%(asctime)s - %(message)s"
 FORMAT = "%(funcName)s | %(message)s"
+# Records are rendered by RichHandler on a listener thread, so logging never waits on the terminal
+richHandler = GatedRichHandler(rich_tracebacks=True)
+richHandler.setFormatter(logging.Formatter(fmt=FORMAT, datefmt="[%X]"))
+logQueue: queue.SimpleQueue = queue.SimpleQueue()
 logging.basicConfig(
     level="INFO",
     style="%",
     format=FORMAT,
     datefmt="[%X]",
-    handlers=[RichHandler(rich_tracebacks=True)]
+    handlers=[RecordQueueHandler(logQueue)]
 )
+logListener = QueueListener(logQueue, richHandler, respect_handler_level=True)
+logListener.start()
+atexit.register(logListener.stop)
 
 l = logging.getLogger(name="rich")  # noqa: E741
+_promptDepth = threading.local()
+
+
+def flushLogs(timeout: float = 1.0) -> bool:
+    """Wait until the records queued so far have been written. Returns False on timeout."""
+    flushEvent = threading.Event()
+    logQueue.put(logging.makeLogRecord({"flushEvent": flushEvent, "levelno": logging.CRITICAL}))
+    return flushEvent.wait(timeout)
+
+
+@contextlib.contextmanager
+def interactivePrompt() -> Iterator[None]:
+    """ Give a prompt the terminal: write out pending log records first, then hold the records that other
+    threads log until the prompt returns, so they do not interleave with inquirer or input() output."""
+    depth: int = getattr(_promptDepth, "value", 0)
+    if depth == 0:
+        flushLogs()
+    _promptDepth.value = depth + 1
+    try:
+        with richHandler.gate:
+            yield
+    finally:
+        _promptDepth.value = depth
+
+
 install()
-p = Console(soft_wrap=True, style=sWB, tab_size=4, record=True, markup=True, emoji=True,
-            emoji_variant="emoji", highlight=True, log_time=True, log_path=True, log_time_format="[%X]")
+p = BoundedConsole(soft_wrap=True, style=sWB, tab_size=4, record=True, markup=True, emoji=True,
+                   emoji_variant="emoji", highlight=True, log_time=True, log_path=True, log_time_format="[%X]")
 
 ### FOLLOWING IS THE CONSOLE CLASS FROM RICH LIBRARY ###
 # class Console(
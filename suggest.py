@@ -0,0 +1,122 @@
+# suggest.py
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from setup_logger import l
+
+OPTION_TYPES: Tuple[str, ...] = ("_Type", "_Category", "_Tag")
+PARENT_TYPES: Dict[str, Tuple[str, ...]] = {"_Type": (), "_Category": ("_Type",), "_Tag": ("_Category", "_Type")}
+TOKEN_PATTERN = re.compile(r"[a-z]{3,}|\d{3,4}p")
+DEFAULT_WEIGHTS: Dict[str, float] = {"frequency": 1.0, "recency": 1.0, "parent": 3.0, "filename": 2.0, "quality": 0.5}
+
+
+def filenameTokens(filename: str) -> set[str]:
+    """Lower-case word tokens of a filename (extension and short noise tokens dropped)."""
+    stem: str = filename.rsplit(".", 1)[0].lower()
+    return set(TOKEN_PATTERN.findall(stem))
+
+
+class SuggestionEngine:
+    """ Ranks prompt options by how likely they are for the file being reviewed.
+    Learned from decided media rows: how often and how recently each option was chosen, how often it followed
+    the already chosen parent (_Type -> _Category -> _Tag), and how often it was chosen for files sharing
+    filename tokens or quality. The context-free ranking is precomputed per option type and refreshed lazily;
+    observe() folds in each new decision so the engine never re-reads the table.
+    Methods:  observe(record): Learn from one decided record (dict with soureceFileName, FileRes and option columns).
+              rank(option_type, options, context): Return options ordered by score, unseen options last in their original order."""
+
+    def __init__(self, weights: Optional[Mapping[str, float]] = None, recencyHalfLife: float = 200.0,
+                 minTokenCount: int = 2) -> None:
+        self.weights: Dict[str, float] = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.recencyHalfLife: float = recencyHalfLife
+        self.minTokenCount: int = minTokenCount
+        self._sequence: int = 0
+        self._frequency: Dict[str, Counter] = defaultdict(Counter)
+        self._lastSeen: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._byParent: Dict[Tuple[str, str, str], Counter] = defaultdict(Counter)  # (option_type, parent_type, parent) -> options
+        self._byToken: Dict[Tuple[str, str], Counter] = defaultdict(Counter)  # (option_type, token) -> options
+        self._tokenCount: Counter = Counter()
+        self._byQuality: Dict[Tuple[str, str], Counter] = defaultdict(Counter)
+        self._baseRanking: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def fromRows(cls, rows: Iterable[Mapping[str, Any]], **kwargs: Any) -> "SuggestionEngine":
+        """Build an engine from historical records, oldest first."""
+        engine = cls(**kwargs)
+        count: int = 0
+        for row in rows:
+            engine.observe(record=row)
+            count += 1
+        l.info(msg=f"Suggestion engine learned from {count} records")
+        return engine
+
+    def observe(self, record: Mapping[str, Any]) -> None:
+        choices: Dict[str, str] = {t: record[t] for t in OPTION_TYPES if record.get(t)}
+        if not choices:
+            return
+        tokens: set[str] = filenameTokens(str(record.get("soureceFileName") or ""))
+        quality: str = str(record.get("FileRes") or "")
+        with self._lock:
+            self._sequence += 1
+            self._tokenCount.update(tokens)
+            for option_type, option in choices.items():
+                self._frequency[option_type][option] += 1
+                self._lastSeen[option_type][option] = self._sequence
+                for parent_type in PARENT_TYPES[option_type]:
+                    if parent := choices.get(parent_type):
+                        self._byParent[(option_type, parent_type, parent)][option] += 1
+                for token in tokens:
+                    self._byToken[(option_type, token)][option] += 1
+                if quality:
+                    self._byQuality[(option_type, quality)][option] += 1
+            self._baseRanking.clear()
+
+    def _base(self, option_type: str) -> Dict[str, float]:
+        """Context-free score (frequency and recency), cached until the next observe()."""
+        if (ranking := self._baseRanking.get(option_type)) is not None:
+            return ranking
+        frequency: Counter = self._frequency[option_type]
+        maxFrequency: float = math.log1p(max(frequency.values(), default=0)) or 1.0
+        ranking = {}
+        for option, count in frequency.items():
+            age: int = self._sequence - self._lastSeen[option_type][option]
+            ranking[option] = (self.weights["frequency"] * math.log1p(count) / maxFrequency
+                               + self.weights["recency"] * 0.5 ** (age / self.recencyHalfLife))
+        self._baseRanking[option_type] = ranking
+        return ranking
+
+    @staticmethod
+    def _share(counter: Optional[Counter], option: str) -> float:
+        if not counter:
+            return 0.0
+        return counter[option] / sum(counter.values())
+
+    def score(self, option_type: str, option: str, context: Mapping[str, Any]) -> float:
+        with self._lock:
+            return self._score(option_type=option_type, option=option, context=context,
+                               tokens=filenameTokens(str(context.get("soureceFileName") or "")))
+
+    def _score(self, option_type: str, option: str, context: Mapping[str, Any], tokens: set[str]) -> float:
+        total: float = self._base(option_type).get(option, 0.0)
+        for parent_type in PARENT_TYPES.get(option_type, ()):
+            if parent := context.get(parent_type):
+                total += self.weights["parent"] * self._share(self._byParent.get((option_type, parent_type, parent)), option)
+                break  # the nearest chosen parent is the most specific evidence
+        knownTokens: List[str] = [t for t in tokens if self._tokenCount[t] >= self.minTokenCount]
+        if knownTokens:
+            total += self.weights["filename"] * sum(self._share(self._byToken.get((option_type, t)), option)
+                                                    for t in knownTokens) / len(knownTokens)
+        if quality := context.get("FileRes"):
+            total += self.weights["quality"] * self._share(self._byQuality.get((option_type, str(quality))), option)
+        return total
+
+    def rank(self, option_type: str, options: List[str], context: Optional[Mapping[str, Any]] = None) -> List[str]:
+        context = context or {}
+        tokens: set[str] = filenameTokens(str(context.get("soureceFileName") or ""))
+        with self._lock:
+            scores: Dict[str, float] = {option: self._score(option_type=option_type, option=option, context=context, tokens=tokens)
+                                        for option in options}
+        return sorted(options, key=lambda option: -scores[option])  # stable: ties keep catalogue order
@@ -1,8 +1,12 @@
 from tkinter import Tk, filedialog
+import csv
 import inquirer
+import json
 import sqlite3
+import time
 import yaml
-from typing import Any, Dict, List, Literal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Literal, Optional, Sequence
 from rich.console import Console
 from rich.table import Table
 console = Console()
@@ -43,24 +47,94 @@ def insert_record(db_file: str, table_name: str, data: Dict[str, Any]) -> None:
         conn.commit()
 
 
-def execute_custom_query(db_file: str, query: str) -> None:
+PAGE_SIZE = 50
+
+
+def render_rows(column_names: Sequence[str], rows: Sequence[tuple], title: Optional[str] = None) -> None:
+    """Print one page of rows as a rich table."""
+    table = Table(show_header=True, header_style="bold magenta", title=title)
+    for column in column_names:
+        table.add_column(column)
+    for row in rows:
+        # Format each cell as a string to ensure compatibility with the Rich table
+        table.add_row(*[str(cell) if cell is not None else "N/A" for cell in row])
+    console.print(table)
+
+
+def ask_page_action(choices: List[str]) -> str:
+    answer = inquirer.prompt([inquirer.List('page', message="Navigate", choices=choices)])
+    return answer['page'] if answer else 'Quit'
+
+
+def execute_custom_query(db_file: str, query: str, page_size: int = PAGE_SIZE) -> None:
+    """Run an arbitrary query and show its result a page at a time with fetchmany.
+    The cursor is forward-only, so only the current page is ever held in memory."""
     with DBConnection(db_file) as conn:
         cursor = conn.cursor()
         cursor.execute(query)
-        records = cursor.fetchall()
+        if cursor.description is None:
+            conn.commit()
+            console.print(f"Query executed, {cursor.rowcount} rows affected.")
+            return
         column_names = [description[0] for description in cursor.description]
+        shown = 0
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                break
+            render_rows(column_names, rows, title=f"Rows {shown + 1}-{shown + len(rows)}")
+            shown += len(rows)
+            if len(rows) < page_size or ask_page_action(['Next', 'Quit']) == 'Quit':
+                break
+        if shown == 0:
+            console.print("No rows returned.")
+
+
+def fetch_page(conn: sqlite3.Connection, table_name: str, page_size: int, after: Optional[int] = None,
+               before: Optional[int] = None, last: bool = False) -> tuple[List[str], List[tuple]]:
+    """Fetch one page by keyset pagination on rowid: rows after a rowid, before a rowid, or the last page.
+    Seeks straight to the page through the rowid b-tree, so later pages cost the same as the first (unlike OFFSET).
+    The first column of every row is the rowid."""
+    table = quote_identifier(table_name)
+    if after is not None:
+        cursor = conn.execute(f"SELECT rowid AS _rowid, * FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?", (after, page_size))
+    elif before is not None or last:
+        condition = "WHERE rowid < ?" if before is not None else ""
+        params = (before, page_size) if before is not None else (page_size,)
+        cursor = conn.execute(f"SELECT rowid AS _rowid, * FROM {table} {condition} ORDER BY rowid DESC LIMIT ?", params)
+    else:
+        cursor = conn.execute(f"SELECT rowid AS _rowid, * FROM {table} ORDER BY rowid LIMIT ?", (page_size,))
+    rows = cursor.fetchall()
+    if after is None and (before is not None or last):
+        rows.reverse()
+    return [description[0] for description in cursor.description], rows
 
-        # Create a table
-        table = Table(show_header=True, header_style="bold magenta")
-        for column in column_names:
-            table.add_column(column)
-
-        for row in records:
-            # Format each cell as a string to ensure compatibility with the Rich table
-            formatted_row = [str(cell) if cell is not None else "N/A" for cell in row]
-            table.add_row(*formatted_row)
 
-        console.print(table)
+def browse_table(db_file: str, table_name: str, page_size: int = PAGE_SIZE) -> List[tuple]:
+    """Page through a table with First / Previous / Next / Last navigation. Only the visible page is fetched.
+    Returns the rows of the last page shown (rowid first)."""
+    with DBConnection(db_file) as conn:
+        column_names, rows = fetch_page(conn, table_name, page_size)
+        while True:
+            if not rows:
+                console.print(f"No records in {table_name}.")
+                return rows
+            render_rows(column_names, rows, title=f"{table_name}: rowid {rows[0][0]}-{rows[-1][0]}")
+            action = ask_page_action(['Next', 'Previous', 'First', 'Last', 'Quit'])
+            if action == 'Quit':
+                return rows
+            if action == 'Next':
+                page = fetch_page(conn, table_name, page_size, after=rows[-1][0])[1]
+            elif action == 'Previous':
+                page = fetch_page(conn, table_name, page_size, before=rows[0][0])[1]
+            elif action == 'First':
+                page = fetch_page(conn, table_name, page_size)[1]
+            else:
+                page = fetch_page(conn, table_name, page_size, last=True)[1]
+            if page:
+                rows = page
+            else:
+                console.print("No more records in that direction.")
 
 
 def fetch_all_records(db_file: str, table_name: str) -> list:
@@ -86,44 +160,132 @@ def delete_record(db_file: str, table_name: str, condition: str) -> None:
         conn.commit()
 
 
-def bulk_insert_from_yaml(db_file: str, table_name: str, yaml_file: str) -> None:
-    with open(yaml_file, 'r') as file:
-        records = yaml.safe_load(file)
-        for record in records:
-            insert_record(db_file, table_name, record)
-
+def iter_yaml_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield the items of a top-level YAML sequence one at a time (or each document of a multi-document
+    stream) without building the whole document in memory."""
+    with open(path, 'r', encoding='utf-8') as file:
+        loader = yaml.SafeLoader(file)
+        try:
+            loader.get_event()  # StreamStartEvent
+            while loader.check_event(yaml.DocumentStartEvent):
+                loader.get_event()
+                if loader.check_event(yaml.SequenceStartEvent):
+                    loader.get_event()
+                    while not loader.check_event(yaml.SequenceEndEvent):
+                        yield loader.construct_object(loader.compose_node(None, None), deep=True)
+                        loader.constructed_objects.clear()
+                    loader.get_event()
+                elif not loader.check_event(yaml.DocumentEndEvent):
+                    yield loader.construct_object(loader.compose_node(None, None), deep=True)
+                    loader.constructed_objects.clear()
+                loader.get_event()  # DocumentEndEvent
+                loader.anchors = {}
+        finally:
+            loader.dispose()
+
+
+def iter_jsonl_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield CSV rows as dicts keyed by the header; empty cells become NULL."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            yield {key: value if value != '' else None for key, value in row.items()}
+
+
+RECORD_READERS = {'.yaml': iter_yaml_records, '.yml': iter_yaml_records, '.jsonl': iter_jsonl_records,
+                  '.ndjson': iter_jsonl_records, '.csv': iter_csv_records}
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream records from a YAML, JSON Lines or CSV file, chosen by extension."""
+    reader = RECORD_READERS.get(Path(path).suffix.lower())
+    if reader is None:
+        raise ValueError(f"Unsupported file type: {path} (expected one of {', '.join(RECORD_READERS)})")
+    return reader(path)
+
+
+def quote_identifier(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def build_insert_query(table_name: str, columns: Sequence[str], on_conflict: Optional[str] = None,
+                       conflict_columns: Sequence[str] = ()) -> str:
+    """INSERT statement for one column set. on_conflict: None (fail), 'ignore', 'replace' or 'update' (upsert
+    on conflict_columns, overwriting the other columns)."""
+    column_list = ', '.join(quote_identifier(column) for column in columns)
+    placeholders = ', '.join('?' * len(columns))
+    verb = {'ignore': 'INSERT OR IGNORE', 'replace': 'INSERT OR REPLACE'}.get(on_conflict or '', 'INSERT')
+    query = f"{verb} INTO {quote_identifier(table_name)} ({column_list}) VALUES ({placeholders})"
+    if on_conflict == 'update':
+        if not conflict_columns:
+            raise ValueError("Upsert needs the conflict columns (a PRIMARY KEY or UNIQUE index)")
+        updates = [column for column in columns if column not in conflict_columns]
+        target = ', '.join(quote_identifier(column) for column in conflict_columns)
+        if updates:
+            assignments = ', '.join(f"{quote_identifier(column)} = excluded.{quote_identifier(column)}" for column in updates)
+            query += f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+        else:
+            query += f" ON CONFLICT ({target}) DO NOTHING"
+    return query
+
+
+def bulk_import(db_file: str, table_name: str, records: Iterable[Dict[str, Any]], batch_size: int = 5000,
+                on_conflict: Optional[str] = None, conflict_columns: Sequence[str] = ()) -> int:
+    """Insert streamed records over one connection with executemany, one transaction per batch.
+    Records are grouped by their column set so each group shares a prepared statement. A failing batch is
+    rolled back on its own; batches committed before it stay. Returns the number of rows written."""
+    buffers: Dict[tuple, List[tuple]] = {}
+    queries: Dict[tuple, str] = {}
+    written = 0
+    start = time.perf_counter()
+
+    def flush(conn: sqlite3.Connection, columns: tuple) -> None:
+        nonlocal written
+        rows = buffers.pop(columns, [])
+        if not rows:
+            return
+        if columns not in queries:
+            queries[columns] = build_insert_query(table_name, columns, on_conflict, conflict_columns)
+        with conn:
+            conn.executemany(queries[columns], rows)
+        written += len(rows)
+        elapsed = time.perf_counter() - start
+        console.print(f"{written:,} rows imported ({written / max(elapsed, 1e-9):,.0f} rows/s)", style="cyan")
 
-def fetch_and_display_records(db_file, table_name) -> list[Any]:
     with DBConnection(db_file) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table_name}")
-        records = cursor.fetchall()
-        # Assuming the first column is the ID
-        console.print("\nRecords in the table:")
         for record in records:
-            console.print(f"- ID: {record[0]}, Data: {record[1:]}")
-        return records
+            columns = tuple(record)
+            buffer = buffers.setdefault(columns, [])
+            buffer.append(tuple(record.values()))
+            if len(buffer) >= batch_size:
+                flush(conn, columns)
+        for columns in list(buffers):
+            flush(conn, columns)
+    elapsed = time.perf_counter() - start
+    console.print(f"Imported {written:,} rows into {table_name} in {elapsed:.1f}s "
+                  f"({written / max(elapsed, 1e-9):,.0f} rows/s)", style="green")
+    return written
 
 
-def print_db_records(db_file, table_name) -> None:
-    console.print(f"Printint table: {table_name} in database: {db_file}")
-    with DBConnection(db_file) as conn:
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT * FROM {table_name}")
-        records = cursor.fetchall()
-        column_names = [description[0] for description in cursor.description]
+def bulk_insert_from_yaml(db_file: str, table_name: str, yaml_file: str) -> None:
+    bulk_import(db_file, table_name, iter_yaml_records(yaml_file))
 
-        # Create a table
-        table = Table(show_header=True, header_style="bold magenta")
-        for column in column_names:
-            table.add_column(column)
 
-        for row in records:
-            # Format each cell as a string to ensure compatibility with the Rich table
-            formatted_row = [str(cell) if cell is not None else "N/A" for cell in row]
-            table.add_row(*formatted_row)
+def fetch_and_display_records(db_file, table_name) -> list[Any]:
+    """Let the user page to the record they want; returns the rows of the page they stopped on."""
+    console.print("\nRecords in the table:")
+    return browse_table(db_file, table_name)
 
-        console.print(table)
+
+def print_db_records(db_file, table_name) -> None:
+    console.print(f"Printint table: {table_name} in database: {db_file}")
+    browse_table(db_file, table_name)
 
 
 # def main_menu() -> Any | Literal['Exit']:
@@ -153,7 +315,7 @@ def main_menu() -> Any | Literal['Exit']:
                           'Insert Record',
                           'Update Record',
                           'Delete Record',
-                          'Bulk Insert From YAML',
+                          'Bulk Import From File',
                           'Print Records',
                           'Execute Custom Query',  # Add this line
                           'Exit'
@@ -281,7 +443,7 @@ def main() -> None:
             console.print("No table name provided or invalid table name. Exiting.")
             break
 
-        if action in ['Add Column', 'Insert Record', 'Update Record', 'Delete Record', 'Bulk Insert From YAML', 'Print Records']:
+        if action in ['Add Column', 'Insert Record', 'Update Record', 'Delete Record', 'Bulk Import From File', 'Print Records']:
             list_table_columns(db_file, table_name)
 
         if action == 'Add Column':
@@ -356,12 +518,24 @@ def main() -> None:
             if condition:
                 delete_record(db_file, table_name, condition['condition'])
 
-        elif action == 'Bulk Insert From YAML':
-            yaml_file = inquirer.prompt([
-                inquirer.Text('yaml_file', message='Enter path to YAML file:')
+        elif action == 'Bulk Import From File':
+            import_details = inquirer.prompt([
+                inquirer.Text('import_file', message='Enter path to YAML, JSON Lines or CSV file:'),
+                inquirer.Text('batch_size', message='Rows per transaction:', default='5000',
+                              validate=lambda _, x: x.isdigit() and int(x) > 0),
+                inquirer.List('on_conflict', message='On conflict:', choices=['fail', 'ignore', 'replace', 'update']),
+                inquirer.Text('conflict_columns', message='Conflict columns for update (comma separated):',
+                              ignore=lambda answers: answers['on_conflict'] != 'update'),
             ])
-            if yaml_file:
-                bulk_insert_from_yaml(db_file, table_name, yaml_file['yaml_file'])
+            if import_details:
+                on_conflict = import_details['on_conflict']
+                try:
+                    bulk_import(db_file, table_name, iter_records(import_details['import_file']),
+                                batch_size=int(import_details['batch_size']),
+                                on_conflict=None if on_conflict == 'fail' else on_conflict,
+                                conflict_columns=[c.strip() for c in (import_details.get('conflict_columns') or '').split(',') if c.strip()])
+                except (OSError, ValueError, yaml.YAMLError, sqlite3.Error) as e:
+                    handle_error(e)
 
         elif action == 'Print Records':
             print_db_records(db_file, table_name)
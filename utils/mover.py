@@ -1,8 +1,17 @@
 import click
-import shutil
+import os
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from rich.console import Console
+from rich.progress import BarColumn, DownloadColumn, Progress, TextColumn, TimeRemainingColumn, TransferSpeedColumn
+
+try:
+    from .transfer import DestinationNameIndex, move_file
+except ImportError:  # run as a script from utils/
+    from transfer import DestinationNameIndex, move_file
 
 console = Console()
 
@@ -13,15 +22,89 @@ def sanitize_filename(filename, pattern, replacement):
     return sanitized
 
 
-def get_unique_filename(destination, filename):
-    """Generate a unique filename to avoid overwriting existing files."""
-    counter = 1
-    new_filename = filename
-    while (destination / new_filename).exists():
-        name, ext = filename.rsplit('.', 1)
-        new_filename = f"{name}_{counter}.{ext}"
-        counter += 1
-    return new_filename
+def device_of(path):
+    """st_dev of path, or of its nearest existing parent for destinations that do not exist yet."""
+    for candidate in (path, *path.parents):
+        try:
+            return candidate.stat().st_dev
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def plan_moves(source_path, destination_path, pattern, flatten):
+    """Build the list of (source, destination, size, same_device, source_device) moves without touching anything.
+    flatten=True is --copy-files-only (unique names in one folder), False is --copy-with-structure."""
+    destination_device = device_of(destination_path)
+    name_index = DestinationNameIndex()
+    plan = []
+    for file_path in source_path.rglob(pattern):
+        if not file_path.is_file():
+            continue
+        if flatten:
+            new_destination = destination_path / name_index.reserve(destination_path, file_path.name)
+        else:
+            new_destination = destination_path / file_path.relative_to(source_path)
+        stat = file_path.stat()
+        plan.append((file_path, new_destination, stat.st_size, stat.st_dev == destination_device, stat.st_dev))
+    return plan
+
+
+def print_plan(plan):
+    renames = [move for move in plan if move[3]]
+    copies = [move for move in plan if not move[3]]
+    for file_path, new_destination, size, same_device, _ in plan:
+        console.print(f"{'rename' if same_device else 'copy  '} {file_path}         To: {new_destination} ({size:,} bytes)", style="cyan")
+    console.print(f"Dry run: {len(plan)} files, {sum(move[2] for move in plan):,} bytes", style="blue")
+    console.print(f"  {len(renames)} same-filesystem renames, {len(copies)} cross-device copies "
+                  f"({sum(move[2] for move in copies):,} bytes to copy)", style="blue")
+
+
+def move_one(file_path, new_destination, same_device, device_limit, verify_hash=False):
+    """Move a single file: a plain rename on the same filesystem, otherwise a zero-copy transfer holding device_limit,
+    the semaphore of the source drive."""
+    new_destination.parent.mkdir(parents=True, exist_ok=True)
+    if same_device:
+        try:
+            os.rename(file_path, new_destination)
+            return
+        except OSError:
+            pass  # e.g. a bind mount reporting the same device; fall back to a copy
+    with device_limit:
+        move_file(file_path, new_destination, verify_hash=verify_hash)
+
+
+def execute_moves(plan, workers, per_device, verify_hash=False):
+    """Run the planned moves on a bounded thread pool and report progress and throughput.
+    Cross-device copies are additionally limited to per_device at a time per source drive, so parallel
+    readers do not make a spinning disk seek back and forth. Returns (moved_count, error_count)."""
+    # One semaphore per source drive, built before any worker starts so concurrent moves always share it
+    device_limits = {source_device: threading.BoundedSemaphore(max(1, per_device)) for *_, source_device in plan}
+    moved_count = 0
+    error_count = 0
+    total_bytes = sum(move[2] for move in plan)
+    start = time.perf_counter()
+    columns = (TextColumn("{task.description}"), BarColumn(), DownloadColumn(), TransferSpeedColumn(), TimeRemainingColumn())
+    with Progress(*columns, console=console) as progress, ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        task = progress.add_task("Moving", total=total_bytes)
+        futures = {executor.submit(move_one, file_path, new_destination, same_device, device_limits[source_device], verify_hash):
+                   (file_path, new_destination, size)
+                   for file_path, new_destination, size, same_device, source_device in plan}
+        for future in as_completed(futures):
+            file_path, new_destination, size = futures[future]
+            try:
+                future.result()
+                progress.console.print(f"Moved from: {file_path}         To: {new_destination}", style="green")
+                moved_count += 1
+            except Exception as e:
+                progress.console.print(f"Error moving from: {file_path} To: {new_destination}: {e}", style="red")
+                error_count += 1
+            progress.advance(task, size)
+    elapsed = time.perf_counter() - start
+    console.print(f"{total_bytes / 1024 ** 2:,.1f} MiB in {elapsed:.1f}s ({total_bytes / 1024 ** 2 / max(elapsed, 1e-9):,.1f} MiB/s)", style="blue")
+    if error_count > 0:
+        console.print(f"Total errors encountered: {error_count}", style="red")
+    return moved_count, error_count
 
 
 @click.command()
@@ -34,7 +117,12 @@ def get_unique_filename(destination, filename):
 @click.option('--list-directories', '-ld', is_flag=True, help='List directories in the source directory.')
 @click.option('--copy-files-only', is_flag=True, help='Copy only files from source to destination without folders.')
 @click.option('--copy-with-structure', is_flag=True, help='Copy files from source to destination preserving the folder structure.')
-def move_files(source, destination, pattern, regex, replacement, list_files, list_directories, copy_files_only, copy_with_structure):
+@click.option('--workers', '-w', default=4, show_default=True, help='Files moved in parallel.')
+@click.option('--per-device', default=2, show_default=True, help='Concurrent cross-device copies per source drive.')
+@click.option('--dry-run', is_flag=True, help='Print the planned moves without moving anything.')
+@click.option('--verify-hash', is_flag=True, help='Hash-check cross-device copies before deleting the source.')
+def move_files(source, destination, pattern, regex, replacement, list_files, list_directories, copy_files_only, copy_with_structure,
+               workers, per_device, dry_run, verify_hash):
     """
     Move, list, or sanitize files and folders based on the provided options.
     """
@@ -46,37 +134,27 @@ def move_files(source, destination, pattern, regex, replacement, list_files, lis
 
     if source and destination:
         # Move files
-        console.print(f"Moving files from source: {source_path} to destination: {
-                      destination_path} with pattern '{pattern}'", style="yellow")
+        console.print(f"Moving files from source: {source_path} to destination: "
+                      f"{destination_path} with pattern '{pattern}'", style="yellow")
         moved_count = 0
         error_count = 0
 
     if copy_files_only and source and destination:
         console.print(f"Copying files from {source_path} to {destination_path} without preserving folder structure.", style="yellow")
-        files_to_copy = source_path.rglob(pattern)
-        moved_count = 0
-        for file_path in files_to_copy:
-            if file_path.is_file():
-                # Check for duplicates and get a unique filename if needed
-                unique_filename = get_unique_filename(destination_path, file_path.name)
-                new_destination = destination_path / unique_filename
-                shutil.move(str(file_path), str(new_destination))
-                console.print(f"Moved from: {file_path}         To: {new_destination}", style="green")
-                moved_count += 1
+        plan = plan_moves(source_path, destination_path, pattern, flatten=True)
+        if dry_run:
+            print_plan(plan)
+            return
+        moved_count, error_count = execute_moves(plan, workers, per_device, verify_hash)
         console.print(f"Total files moved: {moved_count}", style="blue")
 
     elif copy_with_structure and source and destination:
         console.print(f"Copying files from {source_path} to {destination_path} while preserving folder structure.", style="yellow")
-        files_to_copy = source_path.rglob(pattern)
-        moved_count = 0
-        for file_path in files_to_copy:
-            if file_path.is_file():
-                relative_path = file_path.relative_to(source_path)
-                new_destination = destination_path / relative_path
-                new_destination.parent.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(file_path), str(new_destination))
-                console.print(f'Moved from: {file_path}         To: {new_destination}', style="green")
-                moved_count += 1
+        plan = plan_moves(source_path, destination_path, pattern, flatten=False)
+        if dry_run:
+            print_plan(plan)
+            return
+        moved_count, error_count = execute_moves(plan, workers, per_device, verify_hash)
         console.print(f"Total files copied: {moved_count}", style="blue")
 
         # for file_path in files_to_move:
@@ -120,20 +198,23 @@ def move_files(source, destination, pattern, regex, replacement, list_files, lis
             # Sanitize filenames
             console.print(f"Sanitizing filenames at {target_path} with pattern '{regex}'", style="yellow")
             sanitized_count = 0
-            files_to_sanitize = target_path.rglob(pattern) if pattern else target_path.rglob('*')
+            name_index = DestinationNameIndex()
+            files_to_sanitize = list(target_path.rglob(pattern) if pattern else target_path.rglob('*'))
             for file_path in files_to_sanitize:
                 if file_path.is_file():
                     original_name = file_path.name
                     sanitized_name = sanitize_filename(original_name, regex, replacement)
                     if sanitized_name != original_name:
-                        # Check if the sanitized file already exists and get a unique filename
-                        unique_sanitized_name = get_unique_filename(target_path, sanitized_name)
+                        # Check if the sanitized file already exists in the file's own folder and get a unique filename
+                        unique_sanitized_name = name_index.reserve(file_path.parent, sanitized_name)
                         new_destination = file_path.with_name(unique_sanitized_name)
                         try:
                             file_path.rename(new_destination)
+                            name_index.release(file_path.parent, original_name)
                             console.print(f"Renamed: {file_path} -> {new_destination}", style="green")
                             sanitized_count += 1
                         except Exception as e:
+                            name_index.release(file_path.parent, unique_sanitized_name)
                             console.print(f"Failed to rename: {file_path} -> {new_destination}", style="red")
                             console.print(f"Error: {e}", style="red")
             console.print(f"Total files sanitized: {sanitized_count}", style="blue")
@@ -0,0 +1,155 @@
+import errno
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+
+CHUNK_SIZE = 64 * 1024 * 1024
+HASH_BUFFER = 8 * 1024 * 1024
+
+
+class TransferError(OSError):
+    """Raised when a copied file does not match its source; the source is left in place."""
+
+
+class DestinationNameIndex:
+    """Thread-safe index of the names taken in destination folders, used to pick unique filenames.
+    Each folder is listed once and the index is updated as names are reserved or released, so finding a free
+    name does not stat the disk. A counter per (folder, stem, extension) remembers the last suffix handed out,
+    so flattening n files with the same name stays linear instead of re-trying name_1, name_2, ... each time.
+    Names are compared by os.path.normcase, so on Windows Video.mp4 and video.mp4 collide as they do on NTFS;
+    reserve() still returns the original spelling."""
+
+    def __init__(self):
+        self._names = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _names_in(self, directory):
+        names = self._names.get(directory)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {os.path.normcase(entry.name) for entry in entries}
+            except FileNotFoundError:
+                names = set()
+            self._names[directory] = names
+        return names
+
+    def reserve(self, directory, filename):
+        """Return a name not yet taken in directory (filename itself if free) and mark it as taken."""
+        with self._lock:
+            names = self._names_in(directory)
+            new_filename = filename
+            if os.path.normcase(new_filename) in names:
+                name, ext = filename.rsplit('.', 1) if '.' in filename else (filename, None)
+                key = (directory, os.path.normcase(name), os.path.normcase(ext) if ext is not None else None)
+                counter = self._counters.get(key, 0)
+                while os.path.normcase(new_filename) in names:
+                    counter += 1
+                    new_filename = f"{name}_{counter}.{ext}" if ext is not None else f"{name}_{counter}"
+                self._counters[key] = counter
+            names.add(os.path.normcase(new_filename))
+            return new_filename
+
+    def claim(self, directory, filename):
+        """Mark a name chosen earlier (e.g. recorded in a journal) as taken without renaming it."""
+        with self._lock:
+            self._names_in(directory).add(os.path.normcase(filename))
+
+    def release(self, directory, filename):
+        """Mark a name as free again, e.g. after the file was renamed away."""
+        with self._lock:
+            self._names_in(directory).discard(os.path.normcase(filename))
+
+
+def _copy_range(src_fd, dst_fd, size, chunk_size):
+    """Copy in kernel space: copy_file_range (Linux 4.5+), then sendfile; returns the bytes copied."""
+    copied = 0
+    for kernel_copy in (getattr(os, "copy_file_range", None), getattr(os, "sendfile", None)):
+        if kernel_copy is None:
+            continue
+        try:
+            os.lseek(dst_fd, copied, os.SEEK_SET)  # sendfile writes at the file position, copy_file_range does not move it
+            while copied < size:
+                if kernel_copy is os.sendfile:
+                    sent = os.sendfile(dst_fd, src_fd, copied, min(chunk_size, size - copied))
+                else:
+                    sent = kernel_copy(src_fd, dst_fd, min(chunk_size, size - copied), copied, copied)
+                if sent == 0:
+                    break
+                copied += sent
+            return copied
+        except OSError as e:
+            # Not supported for this pair of filesystems: try the next method from where this one stopped
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF, errno.ENOTSOCK):
+                raise
+    # Userspace fallback (Windows, or no kernel copy available), with large buffers
+    os.lseek(src_fd, copied, os.SEEK_SET)
+    os.lseek(dst_fd, copied, os.SEEK_SET)
+    while copied < size:
+        chunk = os.read(src_fd, min(chunk_size, size - copied))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        copied += len(chunk)
+    return copied
+
+
+def file_hash(path):
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_BUFFER):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fsync_directory(directory):
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def move_file(source, destination, verify_hash=False, chunk_size=CHUNK_SIZE):
+    """Move source to destination, copying without Python buffers when they are on different devices.
+    Same-filesystem moves are a plain rename. Across devices the data goes to a temporary name next to the
+    destination with copy_file_range/sendfile, is fsynced and checked (size, and a blake2b hash with
+    verify_hash), gets the source's timestamps and permissions, and is then renamed into place. The source is
+    deleted last, so an interrupted move never loses the only copy.
+    Returns the destination path."""
+    source, destination = Path(source), Path(destination)
+    try:
+        os.rename(source, destination)
+        return destination
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    stat = os.stat(source)
+    temporary = destination.with_name(f".{destination.name}.{os.getpid()}.part")
+    try:
+        with open(source, "rb") as src, open(temporary, "wb") as dst:
+            copied = _copy_range(src.fileno(), dst.fileno(), stat.st_size, chunk_size)
+            os.fsync(dst.fileno())
+        if copied != stat.st_size or os.stat(temporary).st_size != stat.st_size:
+            raise TransferError(errno.EIO, f"Size mismatch copying {source}: {copied} of {stat.st_size} bytes")
+        if verify_hash and file_hash(source) != file_hash(temporary):
+            raise TransferError(errno.EIO, f"Hash mismatch copying {source}")
+        shutil.copymode(source, temporary)
+        os.utime(temporary, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(temporary, destination)
+        _fsync_directory(destination.parent)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+    os.unlink(source)
+    return destination
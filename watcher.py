@@ -0,0 +1,161 @@
+# watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from scanner import ScanEntry, normaliseExtensions, scanMediaFiles
+from setup_logger import l
+
+# inotify(7) constants
+IN_CLOSE_WRITE, IN_MOVED_TO, IN_CREATE = 0x00000008, 0x00000080, 0x00000100
+IN_Q_OVERFLOW, IN_ISDIR = 0x00004000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class DirectoryWatcher:
+    """ Watches the input folder and reports media files that arrive after startup.
+    Uses inotify on Linux and falls back to polling elsewhere (or when inotify is unavailable). A new file is
+    only reported once its size and mtime have not changed for stableSeconds, so files that are still being
+    downloaded or copied are not picked up half-written.
+    Methods:  start(): Start the watcher thread.
+              stop(): Stop it."""
+
+    def __init__(self, root: Path, extensions: Iterable[str], onFileReady: Callable[[ScanEntry], None],
+                 recursive: bool = False, exclude: Iterable[Path] = (), stableSeconds: float = 3.0,
+                 pollInterval: float = 2.0, useInotify: bool = True) -> None:
+        self.root = Path(root)
+        self.extensions: frozenset[str] = normaliseExtensions(extensions)
+        self.onFileReady = onFileReady
+        self.recursive: bool = recursive
+        self.exclude: list[Path] = list(exclude)
+        self.stableSeconds: float = stableSeconds
+        self.pollInterval: float = pollInterval
+        self.useInotify: bool = useInotify and sys.platform.startswith("linux")
+        self._candidates: Dict[str, Tuple[int, int, float]] = {}  # path -> (size, mtime_ns, unchanged since)
+        self._stopEvent = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="watcher", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+        self._thread.join(timeout=self.pollInterval * 2)
+
+    def _isMedia(self, path: str) -> bool:
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def _isExcluded(self, path: str) -> bool:
+        normalised: str = os.path.normcase(os.path.abspath(path))
+        return any(normalised.startswith(os.path.normcase(os.path.abspath(excluded))) for excluded in self.exclude)
+
+    def _track(self, path: str) -> None:
+        if path not in self._candidates and self._isMedia(path) and not self._isExcluded(path):
+            self._candidates[path] = (-1, -1, time.monotonic())
+
+    def _checkCandidates(self) -> None:
+        """Report candidates whose size and mtime have been stable for stableSeconds."""
+        now: float = time.monotonic()
+        for path, (size, mtime, since) in list(self._candidates.items()):
+            try:
+                stat: os.stat_result = os.stat(path)
+            except OSError:
+                del self._candidates[path]  # moved away or deleted before it settled
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != (size, mtime):
+                self._candidates[path] = (stat.st_size, stat.st_mtime_ns, now)
+            elif now - since >= self.stableSeconds:
+                del self._candidates[path]
+                try:
+                    self.onFileReady(ScanEntry(path=Path(path), stat=stat))
+                except Exception as e:
+                    l.error(msg=f"Error handing over watched file {path}: {e}")
+
+    def _run(self) -> None:
+        if self.useInotify:
+            try:
+                self._runInotify()
+                return
+            except OSError as e:
+                l.error(msg=f"inotify unavailable ({e}), falling back to polling")
+        self._runPolling()
+
+    def _listing(self) -> Set[str]:
+        return {str(entry.path) for entry in scanMediaFiles(root=self.root, extensions=self.extensions,
+                                                            recursive=self.recursive, exclude=self.exclude)}
+
+    def _runPolling(self) -> None:
+        l.info(msg=f"Watching {self.root} by polling every {self.pollInterval}s")
+        known: Set[str] = self._listing()
+        while not self._stopEvent.wait(self.pollInterval):
+            current: Set[str] = self._listing()
+            for path in current - known:
+                self._track(path)
+            known = current
+            self._checkCandidates()
+
+    def _runInotify(self) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd: int = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        watches: Dict[int, str] = {}
+        mask: int = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+        def addWatch(directory: str) -> None:
+            wd: int = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+            if wd < 0:
+                l.error(msg=f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+                return
+            watches[wd] = directory
+
+        try:
+            addWatch(str(self.root))
+            if self.recursive:
+                for directory, subdirectories, _ in os.walk(self.root):
+                    subdirectories[:] = [d for d in subdirectories if not self._isExcluded(os.path.join(directory, d))]
+                    for subdirectory in subdirectories:
+                        addWatch(os.path.join(directory, subdirectory))
+            l.info(msg=f"Watching {self.root} with inotify ({len(watches)} directories)")
+            while not self._stopEvent.is_set():
+                # Wake up at least every pollInterval to re-check files that are still settling
+                readable, _, _ = select.select([fd], [], [], self.pollInterval if self._candidates else 1.0)
+                if readable:
+                    self._readEvents(fd=fd, watches=watches, addWatch=addWatch)
+                self._checkCandidates()
+        finally:
+            os.close(fd)
+
+    def _readEvents(self, fd: int, watches: Dict[int, str], addWatch: Callable[[str], None]) -> None:
+        try:
+            buffer: bytes = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        offset: int = 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, eventMask, _, nameLength = EVENT_HEADER.unpack_from(buffer, offset)
+            name: str = os.fsdecode(buffer[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + nameLength].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + nameLength
+            if eventMask & IN_Q_OVERFLOW:
+                l.error(msg="inotify queue overflowed, rescanning watched folder")
+                for entry in scanMediaFiles(root=self.root, extensions=self.extensions, recursive=self.recursive, exclude=self.exclude):
+                    self._track(str(entry.path))
+                continue
+            directory: Optional[str] = watches.get(wd)
+            if directory is None or not name:
+                continue
+            path: str = os.path.join(directory, name)
+            if eventMask & IN_ISDIR:
+                if self.recursive and eventMask & (IN_CREATE | IN_MOVED_TO) and not self._isExcluded(path):
+                    addWatch(path)
+                    for entry in scanMediaFiles(root=Path(path), extensions=self.extensions, recursive=True, exclude=self.exclude):
+                        self._track(str(entry.path))
+                continue
+            self._track(path)